@@ -89,10 +89,15 @@ CREATE TABLE PokemonMoves (
 (id)
 );
 
+CREATE INDEX idx_pokemonmoves_pokemon_move ON PokemonMoves
+(pokemon_id, move_id);
+
 CREATE TABLE Team (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name VARCHAR
-(100) NOT NULL
+(100) NOT NULL,
+    -- Bumped by the triggers below on every write to the team's pokemon
+    revision INTEGER NOT NULL DEFAULT 0
 );
 
 
@@ -163,6 +168,18 @@ REFERENCES Moves
 );
 
 
+-- Team ids are AUTOINCREMENT and never reused, so (team id, revision) is a
+-- safe cache key for anything derived from a team's pokemon
+CREATE TRIGGER team_pokemon_revision_ai AFTER INSERT ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id = new.team_id;
+END;
+CREATE TRIGGER team_pokemon_revision_ad AFTER DELETE ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id = old.team_id;
+END;
+CREATE TRIGGER team_pokemon_revision_au AFTER UPDATE ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id IN (old.team_id, new.team_id);
+END;
+
 
 -- Create Evolution table to track Pokemon evolution chains
 CREATE TABLE
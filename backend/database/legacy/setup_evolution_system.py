@@ -11,11 +11,94 @@ Run this script whenever you reset the database to restore the complete
 evolution-aware move system.
 """
 
+import argparse
+import hashlib
+import itertools
+import json
 import sqlite3
 import requests
+import threading
 import time
 import os
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# PokeAPI fetches are network-bound, so overlap them across a small pool of
+# threads; kept modest to stay polite to the public API
+MAX_FETCH_WORKERS = 8
+MAX_FETCH_RETRIES = 4
+
+_thread_local = threading.local()
+
+# PokeAPI data for Gen 1 is effectively static, so successful responses are
+# kept on disk and reused by later runs for a month
+POKEAPI_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pokeapi_cache")
+POKEAPI_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Set to refetch evolution data even when the Evolution table is populated
+REFRESH_EVOLUTIONS_ENV = "REFRESH_EVOLUTIONS"
+
+GEN1_POKEMON_IDS = range(1, 152)
+EVOLUTION_CHAIN_INDEX_URL = "https://pokeapi.co/api/v2/evolution-chain/?limit=100000"
+
+# Bulk-load tuning for the setup connection. WAL lets commits skip the
+# rollback-journal fsyncs, which makes synchronous=NORMAL safe; the app
+# opens the database in WAL mode too, so the setting is left in place.
+SETUP_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+)
+
+INSERT_EVOLUTION_SQL = """
+    INSERT OR IGNORE INTO Evolution 
+    (from_pokemon_id, to_pokemon_id, evolution_method, minimum_level, evolution_item, trade_required)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Copy every ancestor's moves to each descendant in one statement. The anc
+# CTE pairs each Pokemon with all of its pre-evolutions; moves the
+# descendant already knows, or that aren't in Moves, are skipped.
+PROPAGATE_EVOLUTION_MOVES_SQL = """
+    WITH RECURSIVE anc(descendant, ancestor) AS (
+        SELECT to_pokemon_id, from_pokemon_id FROM Evolution
+        UNION
+        SELECT a.descendant, e.from_pokemon_id
+        FROM anc a JOIN Evolution e ON e.to_pokemon_id = a.ancestor
+    )
+    INSERT OR IGNORE INTO PokemonMoves (pokemon_id, move_id, level_learned)
+    SELECT DISTINCT a.descendant, pm.move_id, pm.level_learned
+    FROM anc a
+    JOIN PokemonMoves pm ON pm.pokemon_id = a.ancestor
+    WHERE pm.move_id IN (SELECT id FROM Moves)
+      AND NOT EXISTS (
+          SELECT 1 FROM PokemonMoves cur
+          WHERE cur.pokemon_id = a.descendant AND cur.move_id = pm.move_id
+      )
+"""
+
+@contextmanager
+def _bulk_write(conn):
+    """Run the block as one BEGIN IMMEDIATE transaction with cache spilling off.
+
+    Dirty pages stay in the cache until commit instead of spilling to the
+    database file mid-transaction; the connection's previous cache_spill
+    setting is restored afterwards.
+    """
+    cache_spill = conn.execute("PRAGMA cache_spill").fetchone()[0]
+    conn.execute("PRAGMA cache_spill = OFF")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute(f"PRAGMA cache_spill = {int(cache_spill)}")
 
 def create_evolution_table(conn):
     """Create the Evolution table with proper schema"""
@@ -46,14 +129,67 @@ def create_evolution_table(conn):
     conn.commit()
     print("Evolution table created successfully!")
 
+def _get_session() -> requests.Session:
+    """One keep-alive HTTP session per worker thread"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+def _cache_path(url: str) -> str:
+    return os.path.join(POKEAPI_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+def _read_cached(url: str) -> Optional[Dict]:
+    """Return a cached response body for url if one exists and hasn't expired"""
+    path = _cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < POKEAPI_CACHE_TTL:
+            with open(path, "r") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _write_cached(url: str, data: Dict):
+    """Store a response body; written to a temp file first since workers run concurrently"""
+    path = _cache_path(url)
+    os.makedirs(POKEAPI_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _get_json(url: str) -> Optional[Dict]:
+    """GET a PokeAPI URL through the disk cache, backing off and retrying on 429 and 5xx responses"""
+    cached = _read_cached(url)
+    if cached is not None:
+        return cached
+    for attempt in range(MAX_FETCH_RETRIES + 1):
+        response = _get_session().get(url, timeout=30)
+        if response.status_code == 200:
+            data = response.json()
+            _write_cached(url, data)
+            return data
+        if response.status_code != 429 and response.status_code < 500:
+            return None
+        if attempt < MAX_FETCH_RETRIES:
+            retry_after = response.headers.get('Retry-After', '')
+            time.sleep(int(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt)
+    return None
+
+def create_pokemon_moves_index(conn):
+    """Index PokemonMoves by (pokemon_id, move_id) for the move propagation lookups"""
+    print("Creating PokemonMoves index...")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pokemonmoves_pokemon_move ON PokemonMoves(pokemon_id, move_id)")
+    # Refresh planner statistics so the new index is picked up
+    conn.execute("ANALYZE")
+    conn.commit()
+
 def get_pokemon_species_data(pokemon_id: int) -> Optional[Dict]:
     """Get species data for a Pokemon from PokeAPI"""
     try:
         url = f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        return None
+        return _get_json(url)
     except Exception as e:
         print(f"Error fetching species data for Pokemon {pokemon_id}: {e}")
         return None
@@ -61,10 +197,7 @@ def get_pokemon_species_data(pokemon_id: int) -> Optional[Dict]:
 def get_evolution_chain(chain_url: str) -> Optional[Dict]:
     """Get evolution chain data from PokeAPI"""
     try:
-        response = requests.get(chain_url)
-        if response.status_code == 200:
-            return response.json()
-        return None
+        return _get_json(chain_url)
     except Exception as e:
         print(f"Error fetching evolution chain from {chain_url}: {e}")
         return None
@@ -73,11 +206,14 @@ def extract_pokemon_id_from_url(url: str) -> int:
     """Extract Pokemon ID from PokeAPI URL"""
     return int(url.rstrip('/').split('/')[-1])
 
-def parse_evolution_chain(chain_data: Dict) -> List[Dict]:
-    """Parse evolution chain data and extract evolution relationships"""
-    evolutions = []
-    
-    def process_chain_link(chain_link: Dict, from_pokemon_id: Optional[int] = None):
+def parse_evolution_chain(chain_data: Dict) -> Iterator[Tuple]:
+    """Yield evolution relationships from a chain as Evolution row tuples:
+    (from_pokemon_id, to_pokemon_id, evolution_method, minimum_level,
+    evolution_item, trade_required)"""
+    # Walk the chain depth-first with an explicit stack of (link, parent id)
+    stack = [(chain_data['chain'], None)]
+    while stack:
+        chain_link, from_pokemon_id = stack.pop()
         current_pokemon_id = extract_pokemon_id_from_url(chain_link['species']['url'])
         
         # If this isn't the base form, add evolution relationship
@@ -100,128 +236,126 @@ def parse_evolution_chain(chain_data: Dict) -> List[Dict]:
                 elif evolution_detail.get('time_of_day'):
                     evolution_method = "level_time"
                 
-                evolutions.append({
-                    'from_pokemon_id': from_pokemon_id,
-                    'to_pokemon_id': current_pokemon_id,
-                    'evolution_method': evolution_method,
-                    'minimum_level': minimum_level,
-                    'evolution_item': evolution_item,
-                    'trade_required': trade_required
-                })
+                yield (from_pokemon_id, current_pokemon_id, evolution_method,
+                       minimum_level, evolution_item, trade_required)
         
-        # Process next evolutions
-        for next_evolution in chain_link.get('evolves_to', []):
-            process_chain_link(next_evolution, current_pokemon_id)
+        # Process next evolutions, pushed in reverse so they pop in API order
+        stack.extend((next_evolution, current_pokemon_id)
+                     for next_evolution in reversed(chain_link.get('evolves_to', [])))
+
+def chain_species_ids(chain_data: Dict) -> set:
+    """All species ids that appear anywhere in an evolution chain"""
+    ids = set()
+    links = [chain_data['chain']]
+    while links:
+        link = links.pop()
+        ids.add(extract_pokemon_id_from_url(link['species']['url']))
+        links.extend(link.get('evolves_to', []))
+    return ids
+
+def _fetch_gen1_chains(pool) -> Optional[List[Dict]]:
+    """Fetch the evolution chains covering Gen 1 straight from the chain index.
+
+    Chains are numbered in National Dex order, so they are fetched in id
+    order, one pool-sized wave at a time, until every Gen 1 species has
+    been seen or a wave holds only later species. Returns None if the
+    index itself can't be fetched.
+    """
+    try:
+        listing = _get_json(EVOLUTION_CHAIN_INDEX_URL)
+    except Exception as e:
+        print(f"Error fetching evolution chain index: {e}")
+        return None
+    if not listing:
+        return None
+    chain_urls = sorted((entry['url'] for entry in listing['results']),
+                        key=extract_pokemon_id_from_url)
     
-    process_chain_link(chain_data['chain'])
-    return evolutions
+    print("Fetching evolution chains...")
+    remaining = set(GEN1_POKEMON_IDS)
+    chains = []
+    for start in range(0, len(chain_urls), MAX_FETCH_WORKERS):
+        wave_ids = []
+        for chain_data in pool.map(get_evolution_chain, chain_urls[start:start + MAX_FETCH_WORKERS]):
+            if not chain_data:
+                continue
+            species_ids = chain_species_ids(chain_data)
+            wave_ids.append(min(species_ids))
+            if species_ids & remaining:
+                chains.append(chain_data)
+                remaining -= species_ids
+        if not remaining or (wave_ids and min(wave_ids) > GEN1_POKEMON_IDS[-1]):
+            break
+    print(f"Fetched {len(chains)} evolution chains")
+    return chains
 
-def fetch_evolution_data(conn):
-    """Fetch and populate evolution data from PokeAPI"""
-    print("Fetching evolution data from PokeAPI...")
+def _fetch_gen1_chains_via_species(pool) -> List[Dict]:
+    """Discover Gen 1 chains through each species' evolution_chain link"""
+    chain_urls = {}
+    # Fetch every species concurrently, then each distinct chain once
+    print(f"Fetching species data for {len(GEN1_POKEMON_IDS)} Pokemon...")
+    for species_data in pool.map(get_pokemon_species_data, GEN1_POKEMON_IDS):
+        if not species_data:
+            continue
+        evolution_chain_url = species_data['evolution_chain']['url']
+        chain_id = evolution_chain_url.rstrip('/').split('/')[-1]
+        chain_urls.setdefault(chain_id, evolution_chain_url)
     
+    print(f"Fetching {len(chain_urls)} evolution chains...")
+    return [chain_data for chain_data in pool.map(get_evolution_chain, chain_urls.values()) if chain_data]
+
+def fetch_evolution_data(conn, refresh: bool = False):
+    """Fetch and populate evolution data from PokeAPI.
+
+    An already populated Evolution table is kept as-is unless refresh is set,
+    so reruns (e.g. to repair PokemonMoves) skip the network phase.
+    """
     cursor = conn.cursor()
     
-    # Clear existing evolution data
-    cursor.execute("DELETE FROM Evolution")
-    conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM Evolution")
+    existing_count = cursor.fetchone()[0]
+    if existing_count and not refresh:
+        print(f"Evolution table already has {existing_count} relationships, skipping fetch "
+              f"(set {REFRESH_EVOLUTIONS_ENV}=1 or pass --refresh to refetch)")
+        return
     
-    # Get all Gen 1 Pokemon (1-151)
-    gen1_pokemon = range(1, 152)
-    processed_chains = set()
-    all_evolutions = []
+    print("Fetching evolution data from PokeAPI...")
     
-    for pokemon_id in gen1_pokemon:
-        print(f"Processing Pokemon #{pokemon_id}...")
-        
-        # Get species data
-        species_data = get_pokemon_species_data(pokemon_id)
-        if not species_data:
-            continue
-        
-        # Get evolution chain URL
-        evolution_chain_url = species_data['evolution_chain']['url']
-        chain_id = evolution_chain_url.rstrip('/').split('/')[-1]
-        
-        # Skip if we've already processed this chain
-        if chain_id in processed_chains:
-            continue
-        
-        processed_chains.add(chain_id)
-        
-        # Get evolution chain data
-        chain_data = get_evolution_chain(evolution_chain_url)
-        if not chain_data:
-            continue
-        
-        # Parse evolution relationships
-        evolutions = parse_evolution_chain(chain_data)
-        all_evolutions.extend(evolutions)
-        
-        # Rate limiting
-        time.sleep(0.1)
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as pool:
+        chains = _fetch_gen1_chains(pool)
+        if chains is None:
+            chains = _fetch_gen1_chains_via_species(pool)
     
-    print(f"Found {len(all_evolutions)} evolution relationships")
+    print(f"Found {len(chains)} evolution chains")
+    if not chains:
+        # Fetch failures come back empty; don't replace good rows with nothing
+        print("No evolution chains fetched, keeping the existing Evolution table")
+        return
+    
+    # Parse evolution relationships lazily; rows stream straight into the insert
+    evolution_rows = itertools.chain.from_iterable(map(parse_evolution_chain, chains))
     
     # Insert evolution data into database
     print("Inserting evolution data into database...")
     
-    inserted_count = 0
-    for evolution in all_evolutions:
-        # Only include Gen 1 Pokemon (1-151)
-        if (evolution['from_pokemon_id'] <= 151 and 
-            evolution['to_pokemon_id'] <= 151):
-            
-            try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO Evolution 
-                    (from_pokemon_id, to_pokemon_id, evolution_method, minimum_level, evolution_item, trade_required)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    evolution['from_pokemon_id'],
-                    evolution['to_pokemon_id'],
-                    evolution['evolution_method'],
-                    evolution['minimum_level'],
-                    evolution['evolution_item'],
-                    evolution['trade_required']
-                ))
-                
-                if cursor.rowcount > 0:
-                    inserted_count += 1
-                
-            except sqlite3.Error as e:
-                print(f"Error inserting evolution {evolution['from_pokemon_id']} -> {evolution['to_pokemon_id']}: {e}")
-    
-    conn.commit()
+    # Replace the old rows and insert the new ones in one write transaction
+    with _bulk_write(conn):
+        # Clear existing evolution data
+        cursor.execute("DELETE FROM Evolution")
+        inserted_count = _insert_evolutions(cursor, evolution_rows)
     print(f"Inserted {inserted_count} evolution relationships")
 
-def get_evolution_chain_for_pokemon(cursor, pokemon_id: int) -> List[int]:
-    """Get the full evolution chain leading to a Pokemon (including itself)"""
-    chain = []
-    
-    # Recursively find all pre-evolutions
-    def find_pre_evolutions(current_id: int, visited: set):
-        if current_id in visited:
-            return  # Prevent infinite loops
-        visited.add(current_id)
-        
-        # Find what this Pokemon evolves from
-        cursor.execute("""
-            SELECT from_pokemon_id FROM Evolution 
-            WHERE to_pokemon_id = ?
-        """, (current_id,))
-        
-        pre_evolutions = cursor.fetchall()
-        for (pre_evo_id,) in pre_evolutions:
-            find_pre_evolutions(pre_evo_id, visited)
-            if pre_evo_id not in chain:
-                chain.append(pre_evo_id)
-        
-        if current_id not in chain:
-            chain.append(current_id)
-    
-    find_pre_evolutions(pokemon_id, set())
-    return chain
+def _insert_evolutions(cursor, evolution_rows: Iterable[Tuple]) -> int:
+    """Insert Gen 1 evolution relationships, returning how many were new"""
+    # Only include Gen 1 Pokemon (1-151)
+    evo_rows = (row for row in evolution_rows if row[0] <= 151 and row[1] <= 151)
+    try:
+        cursor.executemany(INSERT_EVOLUTION_SQL, evo_rows)
+    except sqlite3.Error as e:
+        print(f"Error inserting evolutions: {e}")
+        raise
+    # For executemany, rowcount is the total number of rows inserted
+    return cursor.rowcount
 
 def update_pokemon_moves_with_evolutions(conn):
     """Update PokemonMoves table to include moves from previous evolutions"""
@@ -229,63 +363,18 @@ def update_pokemon_moves_with_evolutions(conn):
     
     cursor = conn.cursor()
     
-    # Get all Pokemon
-    cursor.execute("SELECT pokedex_number FROM Pokemon ORDER BY pokedex_number")
-    all_pokemon = [row[0] for row in cursor.fetchall()]
-    
-    moves_added = 0
-    
-    for pokemon_id in all_pokemon:
-        print(f"Processing Pokemon #{pokemon_id}...")
-        
-        # Get evolution chain (all pre-evolutions and current Pokemon)
-        evolution_chain = get_evolution_chain_for_pokemon(cursor, pokemon_id)
-        
-        if len(evolution_chain) <= 1:
-            continue  # No pre-evolutions, skip
-        
-        # Get all moves this Pokemon can currently learn
-        cursor.execute("""
-            SELECT move_id, level_learned FROM PokemonMoves 
-            WHERE pokemon_id = ?
-        """, (pokemon_id,))
-        current_moves = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        # For each pre-evolution, get their moves
-        for pre_evo_id in evolution_chain[:-1]:  # Exclude the current Pokemon itself
-            cursor.execute("""
-                SELECT move_id, level_learned FROM PokemonMoves 
-                WHERE pokemon_id = ?
-            """, (pre_evo_id,))
-            
-            pre_evo_moves = cursor.fetchall()
-            
-            for move_id, level_learned in pre_evo_moves:
-                # Skip if the current Pokemon already knows this move
-                if move_id in current_moves:
-                    continue
-                
-                # Check if this move exists in the Moves table
-                cursor.execute("SELECT id FROM Moves WHERE id = ?", (move_id,))
-                if not cursor.fetchone():
-                    continue
-                
-                # Add the move to the current Pokemon's moveset
-                try:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO PokemonMoves (pokemon_id, move_id, level_learned)
-                        VALUES (?, ?, ?)
-                    """, (pokemon_id, move_id, level_learned))
-                    
-                    if cursor.rowcount > 0:
-                        moves_added += 1
-                        
-                except sqlite3.Error as e:
-                    print(f"  Error adding move {move_id} to Pokemon {pokemon_id}: {e}")
-    
-    conn.commit()
+    # Run every lookup and insert inside one write transaction
+    with _bulk_write(conn):
+        moves_added = _add_pre_evolution_moves(cursor)
     print(f"Added {moves_added} moves from pre-evolutions")
 
+def _add_pre_evolution_moves(cursor) -> int:
+    """Copy each Pokemon's pre-evolution moves into its own moveset, returning how many were added"""
+    # rowcount isn't reported for statements that start with WITH
+    changes_before = cursor.connection.total_changes
+    cursor.execute(PROPAGATE_EVOLUTION_MOVES_SQL)
+    return cursor.connection.total_changes - changes_before
+
 def verify_setup(conn):
     """Verify that the evolution system was set up correctly"""
     print("\nVerifying evolution system setup...")
@@ -332,33 +421,38 @@ def verify_setup(conn):
     charizard_moves = cursor.fetchone()[0]
     print(f"\n🔥 Charizard total moves: {charizard_moves}")
 
-def main():
-    """Main setup function"""
+def main(db_path: str = "pokemon.db", refresh: Optional[bool] = None):
+    """Main setup function; returns True if every step completed"""
+    if refresh is None:
+        refresh = bool(os.getenv(REFRESH_EVOLUTIONS_ENV))
+    
     print("🚀 Starting Pokemon Evolution System Setup")
     print("=" * 50)
     
     # Check if database exists
-    db_path = "pokemon.db"
     if not os.path.exists(db_path):
         print(f"❌ Error: Database file '{db_path}' not found!")
         print("Please make sure you're running this script from the backend directory")
         print("and that the Pokemon database has been created.")
-        return
+        return False
     
     # Connect to database
     try:
         conn = sqlite3.connect(db_path)
+        for pragma in SETUP_PRAGMAS:
+            conn.execute(pragma)
         print(f"✅ Connected to database: {db_path}")
     except Exception as e:
         print(f"❌ Error connecting to database: {e}")
-        return
+        return False
     
     try:
-        # Step 1: Create Evolution table
+        # Step 1: Create Evolution table and the PokemonMoves index
         create_evolution_table(conn)
+        create_pokemon_moves_index(conn)
         
         # Step 2: Fetch evolution data from PokeAPI
-        fetch_evolution_data(conn)
+        fetch_evolution_data(conn, refresh)
         
         # Step 3: Update Pokemon moves with pre-evolution moves
         update_pokemon_moves_with_evolutions(conn)
@@ -370,6 +464,7 @@ def main():
         print("\nYour Pokemon now know moves from their pre-evolutions!")
         print("You can test this with the new API endpoint:")
         print("  GET /Pokemon/{id}/moves/with_evolutions")
+        return True
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Setup interrupted by user")
@@ -380,6 +475,13 @@ def main():
     finally:
         conn.close()
         print("\n📝 Database connection closed")
+    return False
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Set up the Pokemon evolution system")
+    parser.add_argument("db_path", nargs="?", default="pokemon.db",
+                        help="path to the Pokemon database (default: pokemon.db)")
+    parser.add_argument("--refresh", action="store_true", default=None,
+                        help="refetch evolution data even if the Evolution table is populated")
+    args = parser.parse_args()
+    main(args.db_path, args.refresh)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+One-off migration for databases created before the current create.sql.
+
+Brings an existing pokemon.db up to date with the schema and settings that
+create.sql (and PokemonDatabase.init_db) give new databases. Each step checks
+whether it has already been applied, so the script is safe to rerun.
+
+Usage: python migrate_database.py [path/to/pokemon.db]
+"""
+
+import argparse
+import os
+import sqlite3
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokemon.db")
+
+def enable_wal(conn) -> bool:
+    """Switch the database to WAL; journal_mode is persistent, so this sticks"""
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        return False
+    conn.execute("PRAGMA journal_mode = WAL")
+    return True
+
+# Trigram FTS5 index over move names. Trigrams keep the substring semantics
+# of LIKE '%search%' while letting SQLite answer from the index; the
+# triggers keep it in sync with Moves. Not part of create.sql because not
+# every SQLite build has FTS5 trigrams; PokemonDatabase.init_db calls
+# add_move_search_index for new databases too.
+MOVES_FTS_SQL = """
+BEGIN;
+CREATE VIRTUAL TABLE moves_fts USING fts5(name, content='Moves', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER moves_fts_ai AFTER INSERT ON Moves BEGIN
+    INSERT INTO moves_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER moves_fts_ad AFTER DELETE ON Moves BEGIN
+    INSERT INTO moves_fts(moves_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER moves_fts_au AFTER UPDATE OF name ON Moves BEGIN
+    INSERT INTO moves_fts(moves_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO moves_fts(rowid, name) VALUES (new.id, new.name);
+END;
+INSERT INTO moves_fts(moves_fts) VALUES ('rebuild');
+COMMIT;
+"""
+
+def add_move_search_index(conn) -> bool:
+    """Create the trigram move name index; skipped if this SQLite lacks FTS5 trigrams"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'moves_fts'").fetchone():
+        return False
+    try:
+        conn.executescript(MOVES_FTS_SQL)
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Warning: move search index unavailable, movedex search will use LIKE: {e}")
+        return False
+    return True
+
+# Team.revision and the TeamPokemon triggers that bump it, as in create.sql
+TEAM_REVISION_SQL = """
+BEGIN;
+ALTER TABLE Team ADD COLUMN revision INTEGER NOT NULL DEFAULT 0;
+CREATE TRIGGER team_pokemon_revision_ai AFTER INSERT ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id = new.team_id;
+END;
+CREATE TRIGGER team_pokemon_revision_ad AFTER DELETE ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id = old.team_id;
+END;
+CREATE TRIGGER team_pokemon_revision_au AFTER UPDATE ON TeamPokemon BEGIN
+    UPDATE Team SET revision = revision + 1 WHERE id IN (old.team_id, new.team_id);
+END;
+COMMIT;
+"""
+
+def add_team_revision(conn) -> bool:
+    """Add the Team.revision column and its TeamPokemon triggers"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'team_pokemon_revision_ai'").fetchone():
+        return False
+    conn.executescript(TEAM_REVISION_SQL)
+    return True
+
+def add_pokemon_moves_index(conn) -> bool:
+    """Index PokemonMoves by (pokemon_id, move_id) and refresh planner statistics"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_pokemonmoves_pokemon_move'").fetchone():
+        return False
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pokemonmoves_pokemon_move ON PokemonMoves(pokemon_id, move_id)")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return True
+
+MIGRATIONS = (
+    ("WAL journal mode", enable_wal),
+    ("move name search index", add_move_search_index),
+    ("team revision counter", add_team_revision),
+    ("PokemonMoves lookup index", add_pokemon_moves_index),
+)
+
+def main(db_path: str = DEFAULT_DB_PATH):
+    """Apply every pending migration to db_path"""
+    if not os.path.exists(db_path):
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        return
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, migrate in MIGRATIONS:
+            if migrate(conn):
+                print(f"✅ Applied: {name}")
+            else:
+                print(f"⏭️  Already applied: {name}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate an existing Pokemon database to the current schema")
+    parser.add_argument("db_path", nargs="?", default=DEFAULT_DB_PATH,
+                        help="path to the Pokemon database (default: database/pokemon.db)")
+    args = parser.parse_args()
+    main(args.db_path)
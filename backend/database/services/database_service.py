@@ -3,13 +3,34 @@ Database service layer for Pokemon team management.
 Handles all database operations without Flask dependencies.
 """
 
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from typing import Optional, List
 import os
 from .models import Team, TeamPokemon, Gen1StatCalculator
+from ..migrate_database import add_move_search_index
+
+# Per-connection tuning. Most traffic is reads over the static Pokemon/Moves
+# tables, so serve pages from mmap and a large page cache; WAL (set when the
+# database is created, or by migrate_database.py) makes synchronous=NORMAL safe.
+CONNECTION_PRAGMAS = (
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Trigram queries need at least three characters; shorter searches use LIKE
+MIN_FTS_SEARCH_LENGTH = 3
+
+# Idle connections kept per pool (read-only and writable are pooled
+# separately). Size it to the server's worker threads.
+POOL_SIZE = 20
 
 class PokemonDatabase:
-    def __init__(self, db_path: str = "pokemon.db"):
+    def __init__(self, db_path: str = "pokemon.db", pool_size: int = POOL_SIZE):
         # If db_path is just a filename, place it in the database directory
         if not os.path.dirname(db_path):
             service_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +38,12 @@ class PokemonDatabase:
             self.db_path = os.path.join(database_dir, db_path)
         else:
             self.db_path = db_path
+        self._pools = {
+            True: queue.LifoQueue(maxsize=pool_size),
+            False: queue.LifoQueue(maxsize=pool_size),
+        }
+        # Per-thread pinned connections for hold_connection()
+        self._local = threading.local()
         self.init_db()
 
     def init_db(self):
@@ -27,6 +54,10 @@ class PokemonDatabase:
             database_dir = os.path.dirname(service_dir)  # Go up one level to database/
             
             with sqlite3.connect(self.db_path) as conn:
+                # journal_mode is persistent, so new databases start out in WAL;
+                # older ones are switched over by migrate_database.py
+                conn.execute("PRAGMA journal_mode = WAL")
+                
                 # First create the tables
                 create_sql_path = os.path.join(database_dir, "create.sql")
                 with open(create_sql_path, "r") as f:
@@ -58,10 +89,81 @@ class PokemonDatabase:
                 # Re-enable foreign keys
                 conn.execute("PRAGMA foreign_keys = ON")
                 conn.commit()
+                
+                # Kept out of create.sql: SQLite builds without FTS5 trigrams
+                # just skip it, rather than aborting the schema halfway
+                add_move_search_index(conn)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            # The trigram index comes from the block above or migrate_database.py;
+            # without it, movedex search falls back to LIKE
+            self.has_move_search_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'moves_fts'"
+            ).fetchone() is not None
+
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection; read_only connections reject writes via query_only"""
+        conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def acquire(self, read_only: bool = False) -> sqlite3.Connection:
+        """Take an idle pooled connection, opening a new one if the pool is empty"""
+        try:
+            return self._pools[read_only].get_nowait()
+        except queue.Empty:
+            return self.connect(read_only)
+
+    def release(self, conn: sqlite3.Connection, read_only: bool = False):
+        """Return a connection to its pool, closing it if the pool is already full"""
+        conn.row_factory = None
+        try:
+            self._pools[read_only].put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def hold_connection(self):
+        """Pin connections to this thread until release_held_connection().
+
+        Meant to span a web request: connection() calls in between reuse one
+        read-only and one writable connection, each taken from its pool on
+        first use.
+        """
+        self._local.held = {}
+
+    def release_held_connection(self):
+        """Return the thread's pinned connections (if any were used) to their pools"""
+        held = getattr(self._local, 'held', None)
+        self._local.held = None
+        for read_only, conn in (held or {}).items():
+            self.release(conn, read_only)
+
+    @contextmanager
+    def connection(self, read_only: bool = False):
+        """Borrow a pooled connection; commits on success, rolls back on error"""
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            conn = held.get(read_only)
+            if conn is None:
+                conn = held[read_only] = self.acquire(read_only)
+            # The connection outlives this call; don't leak its row_factory into the next one
+            conn.row_factory = None
+            with conn:
+                yield conn
+            return
+        conn = self.acquire(read_only)
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.release(conn, read_only)
 
     # Team Operations
     def create_team(self, team: Team) -> Team:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.execute(
                 "INSERT INTO Team (name) VALUES (?)",
                 (team.name,)
@@ -71,7 +173,7 @@ class PokemonDatabase:
         return team
 
     def get_team(self, team_id: int) -> Optional[Team]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM Team WHERE id = ?", (team_id,))
             row = cursor.fetchone()
@@ -80,47 +182,48 @@ class PokemonDatabase:
         return None
 
     def get_all_teams(self) -> List[Team]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM Team")
             rows = cursor.fetchall()
             return [Team(**dict(row)) for row in rows]
 
+    def get_team_revision(self, team_id: int) -> Optional[int]:
+        """Get the team's revision counter, which changes whenever its pokemon change"""
+        with self.connection(read_only=True) as conn:
+            row = conn.execute("SELECT revision FROM Team WHERE id = ?", (team_id,)).fetchone()
+            return row[0] if row else None
+
     def update_team(self, team_id: int, team: Team) -> Optional[Team]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+        with self.connection() as conn:
+            cursor = conn.execute(
                 "UPDATE Team SET name = ? WHERE id = ?",
                 (team.name, team_id)
             )
-            if conn.total_changes == 0:
+            if cursor.rowcount == 0:
                 return None
             conn.commit()
             team.id = team_id
             return team
 
     def delete_team(self, team_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM Team WHERE id = ?", (team_id,))
-            conn.execute("DELETE FROM TeamPokemon WHERE team_id = ?", (team_id,))
-            deleted = conn.total_changes > 0
+        with self.connection() as conn:
+            deleted = conn.execute("DELETE FROM Team WHERE id = ?", (team_id,)).rowcount
+            deleted += conn.execute("DELETE FROM TeamPokemon WHERE team_id = ?", (team_id,)).rowcount
+            deleted = deleted > 0
             conn.commit()
             return deleted
 
     # TeamPokemon Operations
     def get_team_pokemon_count(self, team_id: int) -> int:
         """Get the number of Pokemon currently in a team"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             cursor = conn.execute("SELECT COUNT(*) FROM TeamPokemon WHERE team_id = ?", (team_id,))
             count = cursor.fetchone()[0]
             return count
 
-    def create_team_pokemon(self, tp: TeamPokemon) -> TeamPokemon:
-        """Create a new team pokemon with randomly generated IVs if not provided"""
-        # Check if team already has 6 Pokemon
-        current_pokemon_count = self.get_team_pokemon_count(tp.team_id)
-        if current_pokemon_count >= 6:
-            raise ValueError("Team cannot have more than 6 Pokemon")
-        
+    def _prepare_team_pokemon(self, tp: TeamPokemon) -> TeamPokemon:
+        """Fill in random IVs (if all are 0), full current HP and default status before insert"""
         # Always generate random IVs if they're all 0 (default values)
         if (tp.iv_attack == 0 and tp.iv_defense == 0 and 
             tp.iv_speed == 0 and tp.iv_special == 0):
@@ -139,28 +242,65 @@ class PokemonDatabase:
             max_hp = 10  # fallback
         tp.current_hp = max_hp
         tp.status = tp.status or 'Healthy'
+        return tp
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """INSERT INTO TeamPokemon 
-                   (team_id, pokemon_id, nickname, level,
-                    iv_attack, iv_defense, iv_speed, iv_special,
-                    ev_hp, ev_attack, ev_defense, ev_speed, ev_special,
-                    current_hp, status, move1_id, move2_id, move3_id, move4_id) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (tp.team_id, tp.pokemon_id, tp.nickname, tp.level,
-                 tp.iv_attack, tp.iv_defense, tp.iv_speed, tp.iv_special,
-                 tp.ev_hp, tp.ev_attack, tp.ev_defense, tp.ev_speed, tp.ev_special,
-                 tp.current_hp, tp.status, tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id)
-            )
-            tp.id = cursor.lastrowid
+    @staticmethod
+    def _insert_team_pokemon(conn, tp: TeamPokemon):
+        """Insert a prepared team pokemon on conn and set its id; the caller commits"""
+        cursor = conn.execute(
+            """INSERT INTO TeamPokemon 
+               (team_id, pokemon_id, nickname, level,
+                iv_attack, iv_defense, iv_speed, iv_special,
+                ev_hp, ev_attack, ev_defense, ev_speed, ev_special,
+                current_hp, status, move1_id, move2_id, move3_id, move4_id) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (tp.team_id, tp.pokemon_id, tp.nickname, tp.level,
+             tp.iv_attack, tp.iv_defense, tp.iv_speed, tp.iv_special,
+             tp.ev_hp, tp.ev_attack, tp.ev_defense, tp.ev_speed, tp.ev_special,
+             tp.current_hp, tp.status, tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id)
+        )
+        tp.id = cursor.lastrowid
+
+    def create_team_pokemon(self, tp: TeamPokemon) -> TeamPokemon:
+        """Create a new team pokemon with randomly generated IVs if not provided"""
+        # Check if team already has 6 Pokemon
+        current_pokemon_count = self.get_team_pokemon_count(tp.team_id)
+        if current_pokemon_count >= 6:
+            raise ValueError("Team cannot have more than 6 Pokemon")
+        
+        self._prepare_team_pokemon(tp)
+        with self.connection() as conn:
+            self._insert_team_pokemon(conn, tp)
             conn.commit()
         return tp
 
-    def get_team_pokemon(self, tp_id: int) -> Optional[TeamPokemon]:
-        with sqlite3.connect(self.db_path) as conn:
+    def create_team_pokemons(self, team_id: int, tps: List[TeamPokemon]) -> List[TeamPokemon]:
+        """Create several pokemon on one team in a single transaction (one commit)"""
+        current_pokemon_count = self.get_team_pokemon_count(team_id)
+        if current_pokemon_count + len(tps) > 6:
+            raise ValueError("Team cannot have more than 6 Pokemon")
+
+        for tp in tps:
+            tp.team_id = team_id
+            self._prepare_team_pokemon(tp)
+        # lastrowid is needed per row, so this loops execute() rather than
+        # executemany(); the cost being saved is the per-row commit
+        with self.connection() as conn:
+            for tp in tps:
+                self._insert_team_pokemon(conn, tp)
+            conn.commit()
+        return tps
+
+    def get_team_pokemon(self, tp_id: int, team_id: Optional[int] = None) -> Optional[TeamPokemon]:
+        """Get a team pokemon; when team_id is given it must also belong to that team"""
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("SELECT * FROM TeamPokemon WHERE id = ?", (tp_id,))
+            if team_id is None:
+                cursor = conn.execute("SELECT * FROM TeamPokemon WHERE id = ?", (tp_id,))
+            else:
+                cursor = conn.execute(
+                    "SELECT * FROM TeamPokemon WHERE id = ? AND team_id = ?", (tp_id, team_id)
+                )
             row = cursor.fetchone()
             if row:
                 return TeamPokemon(**dict(row))
@@ -168,7 +308,7 @@ class PokemonDatabase:
 
     def get_team_pokemons_by_team_id(self, team_id: int) -> List[dict]:
         """Get team pokemon with species data and calculated stats"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT tp.*, p.name as pokemon_name, p.type1, p.type2,
@@ -227,8 +367,8 @@ class PokemonDatabase:
             return result
 
     def update_team_pokemon(self, tp_id: int, tp: TeamPokemon) -> Optional[TeamPokemon]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+        with self.connection() as conn:
+            cursor = conn.execute(
                 """UPDATE TeamPokemon 
                    SET team_id = ?, pokemon_id = ?, nickname = ?, level = ?,
                    iv_attack = ?, iv_defense = ?, iv_speed = ?, iv_special = ?,
@@ -241,35 +381,49 @@ class PokemonDatabase:
                  tp.current_hp, tp.status, tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id,
                  tp_id)
             )
-            if conn.total_changes == 0:
+            if cursor.rowcount == 0:
                 return None
             conn.commit()
             tp.id = tp_id
             return tp
 
-    def delete_team_pokemon(self, tp_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT team_id FROM TeamPokemon WHERE id = ?", (tp_id,))
+    def set_team_pokemon_moves(self, tp_id: int, move_ids: List[Optional[int]],
+                               team_id: Optional[int] = None) -> bool:
+        """Overwrite the four move slots in place; False if the team pokemon doesn't exist"""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """UPDATE TeamPokemon SET move1_id = ?, move2_id = ?, move3_id = ?, move4_id = ?
+                   WHERE id = ? AND (? IS NULL OR team_id = ?)""",
+                (*move_ids, tp_id, team_id, team_id)
+            )
+            return cursor.rowcount > 0
+
+    def delete_team_pokemon(self, tp_id: int, team_id: Optional[int] = None) -> bool:
+        with self.connection() as conn:
+            # Look up the pokemon and its team's size in one query
+            cursor = conn.execute(
+                """SELECT (SELECT COUNT(*) FROM TeamPokemon WHERE team_id = tp.team_id)
+                   FROM TeamPokemon tp
+                   WHERE tp.id = ? AND (? IS NULL OR tp.team_id = ?)""",
+                (tp_id, team_id, team_id)
+            )
             result = cursor.fetchone()
             if not result:
                 return False
             
-            team_id = result[0]
-            
             # Check if this would leave the team with no Pokemon
-            current_pokemon_count = self.get_team_pokemon_count(team_id)
+            current_pokemon_count = result[0]
             if current_pokemon_count <= 1:
                 raise ValueError("Cannot delete the last Pokemon from a team. Teams must have at least 1 Pokemon.")
             
-            conn.execute("DELETE FROM TeamPokemon WHERE id = ?", (tp_id,))
-            deleted = conn.total_changes > 0
+            deleted = conn.execute("DELETE FROM TeamPokemon WHERE id = ?", (tp_id,)).rowcount > 0
             conn.commit()
             return deleted
 
     # Pokemon Base Data Operations
     def get_pokemon_base_stats(self, pokemon_id: int) -> Optional[dict]:
         """Get base stats for a Pokémon species"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 "SELECT base_hp, base_attack, base_defense, base_special, base_speed FROM Pokemon WHERE id = ?", 
@@ -286,9 +440,9 @@ class PokemonDatabase:
                 }
             return None
 
-    def get_team_pokemon_with_stats(self, tp_id: int) -> Optional[dict]:
+    def get_team_pokemon_with_stats(self, tp_id: int, team_id: Optional[int] = None) -> Optional[dict]:
         """Get team pokemon data with calculated stats"""
-        tp = self.get_team_pokemon(tp_id)
+        tp = self.get_team_pokemon(tp_id, team_id)
         if not tp:
             return None
             
@@ -315,7 +469,7 @@ class PokemonDatabase:
         stats = Gen1StatCalculator.calculate_all_stats(base_stats, tp.level, ivs, evs)
         
         # Get Pokemon name and other details
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 "SELECT name, pokedex_number, type1, type2 FROM Pokemon WHERE id = ?",
@@ -336,7 +490,7 @@ class PokemonDatabase:
     # Move Management Methods
     def get_pokemon_available_moves(self, pokemon_id: int, max_level: int) -> List[dict]:
         """Get all moves a Pokemon can learn up to a specific level"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT DISTINCT pm.move_id, m.name, m.type, m.power, m.accuracy, 
@@ -361,9 +515,40 @@ class PokemonDatabase:
                 })
             return moves
 
+    def get_movedex(self, search: Optional[str] = None, move_type: Optional[str] = None,
+                    limit: int = 50, offset: int = 0) -> List[dict]:
+        """Get one page of moves ordered by id, optionally filtered by name and type"""
+        query = "SELECT id, name, type, power, accuracy, pp, effect FROM Moves WHERE 1 = 1"
+        params = []
+        if search:
+            if self.has_move_search_index and len(search) >= MIN_FTS_SEARCH_LENGTH:
+                query += " AND id IN (SELECT rowid FROM moves_fts WHERE moves_fts MATCH ?)"
+                params.append('"{}"'.format(search.replace('"', '""')))
+            else:
+                query += " AND name LIKE ?"
+                params.append(f"%{search}%")
+        if move_type:
+            query += " AND type = ?"
+            params.append(move_type)
+        query += " ORDER BY id LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        
+        with self.connection(read_only=True) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(query, params)
+            return [{
+                'id': row['id'],
+                'name': row['name'],
+                'type': row['type'],
+                'power': row['power'],
+                'accuracy': row['accuracy'],
+                'pp': row['pp'],
+                'effect_description': row['effect']
+            } for row in cursor.fetchall()]
+
     def get_move_details(self, move_id: int) -> Optional[dict]:
         """Get detailed information about a move"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
                 SELECT id, name, type, power, accuracy, pp, effect
@@ -3,11 +3,14 @@ Pydantic models for Pokemon team management system.
 Separated from database logic for better organization.
 """
 
-from typing import Optional
-from pydantic import BaseModel
+from typing import Annotated, Optional, Tuple
+from pydantic import BaseModel, Field
 import random
 import math
 
+# Generation 1 EVs range over 0-65535; strict so "5" or 5.0 are rejected
+EVValue = Annotated[int, Field(strict=True, ge=0, le=65535)]
+
 class Team(BaseModel):
     id: Optional[int] = None
     name: str
@@ -24,11 +27,11 @@ class TeamPokemon(BaseModel):
     iv_speed: int = 0
     iv_special: int = 0
     # Effort Values (EVs) - Generation 1 uses 0-65535 range
-    ev_hp: int = 0
-    ev_attack: int = 0
-    ev_defense: int = 0
-    ev_speed: int = 0
-    ev_special: int = 0
+    ev_hp: EVValue = 0
+    ev_attack: EVValue = 0
+    ev_defense: EVValue = 0
+    ev_speed: EVValue = 0
+    ev_special: EVValue = 0
     current_hp: Optional[int] = None
     status: Optional[str] = 'Healthy'
     # Move slots (Generation 1 allows 4 moves max)
@@ -44,6 +47,26 @@ class PokemonStats(BaseModel):
     speed: int
     special: int
 
+def _calc_stats_core(base_hp: int, base_attack: int, base_defense: int, base_speed: int,
+                     base_special: int, level: int,
+                     iv_attack: int, iv_defense: int, iv_speed: int, iv_special: int,
+                     ev_hp: int, ev_attack: int, ev_defense: int, ev_speed: int,
+                     ev_special: int) -> Tuple[int, int, int, int, int]:
+    """Generation 1 stat formulas over plain ints, returning (hp, attack, defense, speed, special).
+
+    Same arithmetic as calculate_hp_stat/calculate_other_stat, flattened so a
+    full stat block costs one call instead of a dozen dict and staticmethod lookups.
+    """
+    sqrt = math.sqrt
+    hp_iv = (iv_attack % 2) * 8 + (iv_defense % 2) * 4 + (iv_speed % 2) * 2 + (iv_special % 2)
+    return (
+        int(((base_hp + hp_iv + sqrt(ev_hp) / 8 + 50) * level / 50) + 10),
+        int(((base_attack + iv_attack + sqrt(ev_attack) / 8) * level / 50) + 5),
+        int(((base_defense + iv_defense + sqrt(ev_defense) / 8) * level / 50) + 5),
+        int(((base_speed + iv_speed + sqrt(ev_speed) / 8) * level / 50) + 5),
+        int(((base_special + iv_special + sqrt(ev_special) / 8) * level / 50) + 5),
+    )
+
 class Gen1StatCalculator:
     """Generation 1 Pokemon stat calculation utilities"""
     
@@ -66,26 +89,11 @@ class Gen1StatCalculator:
     @staticmethod
     def calculate_all_stats(base_stats: dict, level: int, ivs: dict, evs: dict) -> PokemonStats:
         """Calculate all stats for a Pokémon using Generation 1 formulas"""
-        # Calculate HP IV from other IVs
-        hp_iv = Gen1StatCalculator.calculate_hp_iv(
-            ivs['attack'], ivs['defense'], ivs['speed'], ivs['special']
-        )
-        
-        # Calculate all stats
-        hp = Gen1StatCalculator.calculate_hp_stat(
-            base_stats['hp'], level, hp_iv, evs['hp']
-        )
-        attack = Gen1StatCalculator.calculate_other_stat(
-            base_stats['attack'], level, ivs['attack'], evs['attack']
-        )
-        defense = Gen1StatCalculator.calculate_other_stat(
-            base_stats['defense'], level, ivs['defense'], evs['defense']
-        )
-        speed = Gen1StatCalculator.calculate_other_stat(
-            base_stats['speed'], level, ivs['speed'], evs['speed']
-        )
-        special = Gen1StatCalculator.calculate_other_stat(
-            base_stats['special'], level, ivs['special'], evs['special']
+        hp, attack, defense, speed, special = _calc_stats_core(
+            base_stats['hp'], base_stats['attack'], base_stats['defense'],
+            base_stats['speed'], base_stats['special'], level,
+            ivs['attack'], ivs['defense'], ivs['speed'], ivs['special'],
+            evs['hp'], evs['attack'], evs['defense'], evs['speed'], evs['special']
         )
         
         return PokemonStats(
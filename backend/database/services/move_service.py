@@ -67,8 +67,13 @@ class MoveService:
                 })
             return moves_by_level
 
-    def get_pokemon_moves_with_evolutions(self, pokemon_id: int) -> Dict:
-        """Get all moves for a Pokemon including those from previous evolutions"""
+    def get_pokemon_moves_with_evolutions(self, pokemon_id: int, max_level: Optional[int] = None,
+                                          move_type: Optional[str] = None) -> Dict:
+        """Get all moves for a Pokemon including those from previous evolutions.
+
+        max_level and move_type ("level-up" or "tm-hm") are applied in SQL so
+        filtered-out rows never leave SQLite.
+        """
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             
@@ -95,29 +100,38 @@ class MoveService:
             JOIN Moves m ON pm.move_id = m.id
             JOIN Pokemon p ON pm.pokemon_id = p.pokedex_number
             WHERE pm.pokemon_id IN ({})
-            ORDER BY pm.level_learned, m.name
             """.format(','.join(['?'] * len(evolution_chain)))
             
-            cursor = conn.execute(query, evolution_chain)
-            moves = cursor.fetchall()
+            params = evolution_chain[:]
+            
+            if max_level is not None:
+                query += " AND (pm.level_learned <= ? OR pm.level_learned = 0)"
+                params.append(max_level)
             
-            # Get Pokemon and evolution chain names
-            pokemon_cursor = conn.execute("SELECT name FROM Pokemon WHERE pokedex_number = ?", [pokemon_id])
-            pokemon_result = pokemon_cursor.fetchone()
-            pokemon_name = pokemon_result[0] if pokemon_result else f"Pokemon #{pokemon_id}"
+            if move_type == "level-up":
+                query += " AND pm.level_learned > 0"
+            elif move_type == "tm-hm":
+                query += " AND pm.level_learned = 0"
+            
+            query += " ORDER BY pm.level_learned, m.name"
+            
+            cursor = conn.execute(query, params)
+            moves = cursor.fetchall()
             
-            chain_names = {}
-            for evo_id in evolution_chain:
-                cursor = conn.execute("SELECT name FROM Pokemon WHERE pokedex_number = ?", [evo_id])
-                result = cursor.fetchone()
-                if result:
-                    chain_names[evo_id] = result[0]
+            # Get names for the whole chain (it always includes pokemon_id)
+            cursor = conn.execute(
+                "SELECT pokedex_number, name FROM Pokemon WHERE pokedex_number IN ({})".format(
+                    ','.join('?' * len(evolution_chain))),
+                evolution_chain)
+            chain_names = dict(cursor.fetchall())
+            pokemon_name = chain_names.get(pokemon_id, f"Pokemon #{pokemon_id}")
             
             return {
                 "pokemon_id": pokemon_id,
                 "pokemon_name": pokemon_name,
                 "evolution_chain": [{"id": evo_id, "name": chain_names.get(evo_id, f"Pokemon #{evo_id}")} 
                                   for evo_id in evolution_chain],
+                "filters": {"max_level": max_level, "type": move_type},
                 "total_moves": len(moves),
                 "moves": [dict(move) for move in moves]
             }
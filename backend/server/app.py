@@ -7,17 +7,23 @@ from flask_cors import CORS
 from routes.team_routes import team_bp
 from routes.pokemon_routes import pokemon_bp
 from routes.move_routes import move_bp
+from routes.movedex_routes import movedex_bp
+from routes.json_provider import FastJSONProvider
+from routes import db as routes_db
 from evolution_utils import setup_evolution_system
 
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    routes_db.init_app(app)
     CORS(app)
     
     # Register blueprints
     app.register_blueprint(team_bp, url_prefix='/Teams')
     app.register_blueprint(pokemon_bp, url_prefix='/Teams')
     app.register_blueprint(move_bp, url_prefix='/')
+    app.register_blueprint(movedex_bp)
     
     @app.route("/", methods=["GET"])
     def home():
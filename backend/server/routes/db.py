@@ -0,0 +1,27 @@
+"""
+Shared PokemonDatabase for the route modules, holding one pooled
+connection per request.
+"""
+
+import os
+from functools import lru_cache
+from database.database import PokemonDatabase
+
+# Points the routes at another database file, e.g. a scratch copy in tests
+DB_PATH_ENV = "POKEMON_DB_PATH"
+
+@lru_cache(maxsize=1)
+def get_db():
+    """Shared PokemonDatabase; connections come from its pool, so it is thread-safe"""
+    return PokemonDatabase(os.environ.get(DB_PATH_ENV, "pokemon.db"))
+
+def _hold_connection():
+    get_db().hold_connection()
+
+def _release_connection(exc):
+    get_db().release_held_connection()
+
+def init_app(app):
+    """Give each request a single connection, handed back to the pool at teardown"""
+    app.before_request(_hold_connection)
+    app.teardown_request(_release_connection)
@@ -0,0 +1,34 @@
+"""
+Helpers for serving cached JSON bodies.
+Bodies are encoded once, tagged with a strong ETag, and conditional requests
+are answered with 304 Not Modified without re-encoding anything.
+"""
+
+import hashlib
+from typing import Tuple
+from flask import Response, current_app, request
+
+CACHE_MAX_AGE = 300
+
+def dumps_json(obj) -> str:
+    """Compact JSON through the app's JSON provider, formatted like jsonify() output"""
+    return current_app.json.dumps(obj, separators=(',', ':'))
+
+def encode_json(obj) -> Tuple[bytes, str]:
+    """Encode obj as compact JSON and derive a strong ETag from the bytes"""
+    body = dumps_json(obj).encode()
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def etag_response(body: bytes, etag: str, max_age: int = CACHE_MAX_AGE) -> Response:
+    """Return body with caching headers, or an empty 304 if the client already has it.
+
+    Pass max_age=0 for data users can edit, so clients revalidate every time.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
@@ -0,0 +1,44 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+Falls back to Flask's stdlib-json provider otherwise, and for any dumps
+call using options orjson does not support.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ORJSON_DUMP_ARGS = frozenset({('indent', 2), ('separators', (',', ':'))})
+
+def _default(o):
+    """Serialize pydantic models directly so routes can jsonify them without model_dump()"""
+    if isinstance(o, BaseModel):
+        return o.model_dump()
+    return DefaultJSONProvider.default(o)
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        # Flask's response() passes either indent=2 (debug) or compact separators
+        if orjson is None or not _ORJSON_DUMP_ARGS.issuperset(kwargs.items()):
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if 'indent' in kwargs:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits; let the stdlib encoder handle them
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
@@ -2,40 +2,39 @@
 Flask route handlers for move management endpoints.
 """
 
-from flask import Blueprint, request, jsonify
-import sqlite3
-from database.database import Gen1StatCalculator, PokemonDatabase
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from functools import lru_cache
+from database.database import Gen1StatCalculator
 from flask_cors import cross_origin
+from routes.http_cache import dumps_json, encode_json, etag_response
+from routes.db import get_db
 
 move_bp = Blueprint('moves', __name__)
 
-@move_bp.route("/Pokemon/", methods=["GET"])
-@cross_origin()
-def get_all_pokemon():
-    """Get all Pokemon with optional type filtering"""
-    poke_type = request.args.get("type")
-    db = PokemonDatabase()
-    db_path = db.db_path
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        if poke_type:
-            cursor = conn.execute("SELECT * FROM Pokemon WHERE type1 = ? OR type2 = ?", (poke_type, poke_type))
-        else:
-            cursor = conn.execute("SELECT * FROM Pokemon")
-        rows = cursor.fetchall()
-        result = [dict(row) for row in rows]
-    return jsonify(result), 200
+# Column order of the move queries below; rows are fetched as plain tuples
+# and zipped against these instead of going through sqlite3.Row. The
+# per-Pokemon queries also select a trailing pokemon_name column, which
+# zip() leaves out of the move dicts.
+MOVE_COLS = ('move_id', 'move_name', 'level_learned', 'move_type',
+             'power', 'accuracy', 'pp', 'learn_method')
+EVOLUTION_MOVE_COLS = ('move_id', 'move_name', 'level_learned', 'move_type',
+                       'power', 'accuracy', 'pp', 'learned_from_pokemon',
+                       'learned_from_id', 'learn_method')
+LEVEL_MOVE_COLS = ('move_id', 'move_name', 'level_learned', 'move_type',
+                   'power', 'accuracy', 'pp')
 
-@move_bp.route("/Pokemon/<int:pokemon_id>/moves", methods=["GET"])
-def get_pokemon_moves(pokemon_id):
-    """Get all moves for a specific Pokemon, optionally filtered by max level."""
-    max_level = request.args.get("max_level", type=int)
-    move_type = request.args.get("type")
-    
-    with sqlite3.connect("pokemon.db") as conn:
-        conn.row_factory = sqlite3.Row
-        
-        query = """
+# The move queries come in a small, fixed set of shapes (max_level filter
+# on/off x learn-method filter), so every variant is built once here
+# instead of concatenated per request.
+_MAX_LEVEL_FILTER = " AND (pm.level_learned <= ? OR pm.level_learned = 0)"
+_MOVE_TYPE_FILTERS = {
+    None: "",
+    "level-up": " AND pm.level_learned > 0",
+    "tm-hm": " AND pm.level_learned = 0",
+}
+_MOVE_ORDER = " ORDER BY pm.level_learned, m.name"
+
+_MOVES_SELECT = """
         SELECT 
             pm.move_id,
             m.name as move_name,
@@ -47,38 +46,122 @@ def get_pokemon_moves(pokemon_id):
             CASE 
                 WHEN pm.level_learned = 0 THEN 'TM/HM'
                 ELSE 'Level-up'
-            END as learn_method
+            END as learn_method,
+            (SELECT name FROM Pokemon WHERE id = ?) as pokemon_name
         FROM PokemonMoves pm
         JOIN Moves m ON pm.move_id = m.id
         WHERE pm.pokemon_id = ?
         """
-        
-        params = [pokemon_id]
-        
-        if max_level is not None:
-            query += " AND (pm.level_learned <= ? OR pm.level_learned = 0)"
-            params.append(max_level)
-        
-        if move_type == "level-up":
-            query += " AND pm.level_learned > 0"
-        elif move_type == "tm-hm":
-            query += " AND pm.level_learned = 0"
-        
-        query += " ORDER BY pm.level_learned, m.name"
+
+_EVOLUTION_MOVES_SELECT = """
+        SELECT DISTINCT
+            pm.move_id,
+            m.name as move_name,
+            pm.level_learned,
+            m.type as move_type,
+            m.power,
+            m.accuracy,
+            m.pp,
+            p.name as learned_from_pokemon,
+            p.pokedex_number as learned_from_id,
+            CASE 
+                WHEN pm.level_learned = 0 THEN 'TM/HM'
+                ELSE 'Level-up'
+            END as learn_method
+        FROM PokemonMoves pm
+        JOIN Moves m ON pm.move_id = m.id
+        JOIN Pokemon p ON pm.pokemon_id = p.pokedex_number
+        WHERE pm.pokemon_id IN ({})
+        """
+
+_MOVE_QUERIES = {
+    (has_max_level, move_type): (_MOVES_SELECT
+                                 + (_MAX_LEVEL_FILTER if has_max_level else "")
+                                 + type_filter + _MOVE_ORDER)
+    for has_max_level in (False, True)
+    for move_type, type_filter in _MOVE_TYPE_FILTERS.items()
+}
+
+# Evolution chains are padded up to one of these IN-list sizes with an id
+# that can never match, so a handful of statement texts cover every chain
+# and SQLite's statement cache keeps reusing the same prepared plans.
+_CHAIN_BUCKETS = (2, 4, 8)
+_CHAIN_PADDING_ID = -1
+
+def _padded_chain(chain: list) -> list:
+    """Pad an evolution chain to its bucket size with a non-matching id"""
+    n = len(chain)
+    size = next((b for b in _CHAIN_BUCKETS if n <= b), 1 << (n - 1).bit_length())
+    return chain + [_CHAIN_PADDING_ID] * (size - n)
+
+_CHAIN_NAMES_QUERY = "SELECT pokedex_number, name FROM Pokemon WHERE pokedex_number IN ({})"
+
+@lru_cache(maxsize=None)
+def _chain_names_query(chain_length: int) -> str:
+    """Build (once per bucket) the name lookup for an evolution chain"""
+    return _CHAIN_NAMES_QUERY.format(','.join('?' * chain_length))
+
+@lru_cache(maxsize=None)
+def _evolution_moves_query(chain_length: int, has_max_level: bool, move_type) -> str:
+    """Build (once per shape) the with_evolutions query for a padded chain length"""
+    return (_EVOLUTION_MOVES_SELECT.format(','.join('?' * chain_length))
+            + (_MAX_LEVEL_FILTER if has_max_level else "")
+            + _MOVE_TYPE_FILTERS[move_type] + _MOVE_ORDER)
+
+def _pokemon_name(conn, pokemon_id: int, moves: list) -> str:
+    """Name from the trailing pokemon_name column, looked up directly only if no moves matched"""
+    if moves:
+        name = moves[0][-1]
+    else:
+        row = conn.execute("SELECT name FROM Pokemon WHERE id = ?", [pokemon_id]).fetchone()
+        name = row[0] if row else None
+    return name or f"Pokemon #{pokemon_id}"
+
+def _move_filter_params(max_level, move_type):
+    """Normalize the request filters into a query key and extra parameters"""
+    if move_type not in _MOVE_TYPE_FILTERS:
+        move_type = None
+    params = [max_level] if max_level is not None else []
+    return max_level is not None, move_type, params
+
+@lru_cache(maxsize=32)
+def _pokemon_list_body(poke_type):
+    """Encoded Pokemon listing and its ETag, built once per type filter"""
+    with get_db().connection(read_only=True) as conn:
+        if poke_type:
+            cursor = conn.execute("SELECT * FROM Pokemon WHERE type1 = ? OR type2 = ?", (poke_type, poke_type))
+        else:
+            cursor = conn.execute("SELECT * FROM Pokemon")
+        cols = [d[0] for d in cursor.description]
+        result = [dict(zip(cols, row)) for row in cursor.fetchall()]
+    return encode_json(result)
+
+@move_bp.route("/Pokemon/", methods=["GET"])
+@cross_origin()
+def get_all_pokemon():
+    """Get all Pokemon with optional type filtering"""
+    return etag_response(*_pokemon_list_body(request.args.get("type")))
+
+@move_bp.route("/Pokemon/<int:pokemon_id>/moves", methods=["GET"])
+def get_pokemon_moves(pokemon_id):
+    """Get all moves for a specific Pokemon, optionally filtered by max level."""
+    max_level = request.args.get("max_level", type=int)
+    move_type = request.args.get("type")
+    
+    with get_db().connection(read_only=True) as conn:
+        has_max_level, type_key, filter_params = _move_filter_params(max_level, move_type)
+        query = _MOVE_QUERIES[(has_max_level, type_key)]
+        params = [pokemon_id, pokemon_id] + filter_params
         
         cursor = conn.execute(query, params)
         moves = cursor.fetchall()
-        
-        # Get Pokemon name
-        pokemon_cursor = conn.execute("SELECT name FROM Pokemon WHERE id = ?", [pokemon_id])
-        pokemon_result = pokemon_cursor.fetchone()
-        pokemon_name = pokemon_result[0] if pokemon_result else f"Pokemon #{pokemon_id}"
+        pokemon_name = _pokemon_name(conn, pokemon_id, moves)
         
         result = {
             "pokemon_id": pokemon_id,
             "pokemon_name": pokemon_name,
             "filters": {"max_level": max_level, "type": move_type},
-            "moves": [dict(move) for move in moves]
+            "moves": [dict(zip(MOVE_COLS, move)) for move in moves]
         }
         
         return jsonify(result), 200
@@ -89,9 +172,11 @@ def get_pokemon_moves_with_evolutions(pokemon_id):
     max_level = request.args.get("max_level", type=int)
     move_type = request.args.get("type")  # level-up, tm-hm, or all
     
-    with sqlite3.connect("pokemon.db") as conn:
-        conn.row_factory = sqlite3.Row
-        
+    # The connection stays checked out while the response streams and is
+    # handed back to the pool when the response is closed.
+    db = get_db()
+    conn = db.acquire(read_only=True)
+    try:
         # Get evolution chain for this Pokemon
         def get_evolution_chain(current_id: int) -> list:
             """Get all pre-evolutions and current Pokemon"""
@@ -124,59 +209,20 @@ def get_pokemon_moves_with_evolutions(pokemon_id):
         # Get full evolution chain
         evolution_chain = get_evolution_chain(pokemon_id)
         
-        # Base query for moves from entire evolution chain
-        query = """
-        SELECT DISTINCT
-            pm.move_id,
-            m.name as move_name,
-            pm.level_learned,
-            m.type as move_type,
-            m.power,
-            m.accuracy,
-            m.pp,
-            p.name as learned_from_pokemon,
-            p.pokedex_number as learned_from_id,
-            CASE 
-                WHEN pm.level_learned = 0 THEN 'TM/HM'
-                ELSE 'Level-up'
-            END as learn_method
-        FROM PokemonMoves pm
-        JOIN Moves m ON pm.move_id = m.id
-        JOIN Pokemon p ON pm.pokemon_id = p.pokedex_number
-        WHERE pm.pokemon_id IN ({})
-        """.format(','.join(['?'] * len(evolution_chain)))
-        
-        params = evolution_chain[:]
-        
-        # Add filters
-        if max_level is not None:
-            query += " AND (pm.level_learned <= ? OR pm.level_learned = 0)"
-            params.append(max_level)
-        
-        if move_type == "level-up":
-            query += " AND pm.level_learned > 0"
-        elif move_type == "tm-hm":
-            query += " AND pm.level_learned = 0"
-        
-        query += " ORDER BY pm.level_learned, m.name"
-        
-        cursor = conn.execute(query, params)
-        moves = cursor.fetchall()
+        # Moves from the entire evolution chain
+        has_max_level, type_key, filter_params = _move_filter_params(max_level, move_type)
+        chain_params = _padded_chain(evolution_chain)
+        query = _evolution_moves_query(len(chain_params), has_max_level, type_key)
+        params = chain_params + filter_params
         
-        # Get Pokemon name for response
-        pokemon_cursor = conn.execute("SELECT name FROM Pokemon WHERE pokedex_number = ?", [pokemon_id])
-        pokemon_result = pokemon_cursor.fetchone()
-        pokemon_name = pokemon_result[0] if pokemon_result else f"Pokemon #{pokemon_id}"
+        # Get names for the whole chain (it always includes pokemon_id)
+        cursor = conn.execute(_chain_names_query(len(chain_params)), chain_params)
+        chain_names = dict(cursor.fetchall())
+        pokemon_name = chain_names.get(pokemon_id, f"Pokemon #{pokemon_id}")
         
-        # Get evolution chain names
-        chain_names = {}
-        for evo_id in evolution_chain:
-            cursor = conn.execute("SELECT name FROM Pokemon WHERE pokedex_number = ?", [evo_id])
-            result = cursor.fetchone()
-            if result:
-                chain_names[evo_id] = result[0]
+        moves = conn.execute(query, params)
         
-        result = {
+        header = dumps_json({
             "pokemon_id": pokemon_id,
             "pokemon_name": pokemon_name,
             "evolution_chain": [{"id": evo_id, "name": chain_names.get(evo_id, f"Pokemon #{evo_id}")} 
@@ -184,19 +230,32 @@ def get_pokemon_moves_with_evolutions(pokemon_id):
             "filters": {
                 "max_level": max_level,
                 "type": move_type
-            },
-            "total_moves": len(moves),
-            "moves": [dict(move) for move in moves]
-        }
-        
-        return jsonify(result), 200
+            }
+        })
+    except Exception:
+        db.release(conn, read_only=True)
+        raise
+    
+    def generate():
+        """Yield the response as JSON fragments straight off the cursor"""
+        yield header[:-1] + ',"moves":['
+        total_moves = 0
+        for move in moves:
+            if total_moves:
+                yield ','
+            yield dumps_json(dict(zip(EVOLUTION_MOVE_COLS, move)))
+            total_moves += 1
+        yield '],"total_moves":%d}' % total_moves
+    
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    # Runs even if the client goes away before the body is ever iterated
+    response.call_on_close(lambda: db.release(conn, read_only=True))
+    return response
 
 @move_bp.route("/Pokemon/<int:pokemon_id>/moves/level/<int:level>", methods=["GET"])
 def get_pokemon_moves_at_level(pokemon_id, level):
     """Get moves that a Pokemon learns at a specific level."""
-    with sqlite3.connect("pokemon.db") as conn:
-        conn.row_factory = sqlite3.Row
-        
+    with get_db().connection(read_only=True) as conn:
         query = """
         SELECT 
             pm.move_id,
@@ -205,53 +264,56 @@ def get_pokemon_moves_at_level(pokemon_id, level):
             m.type as move_type,
             m.power,
             m.accuracy,
-            m.pp
+            m.pp,
+            (SELECT name FROM Pokemon WHERE id = ?) as pokemon_name
         FROM PokemonMoves pm
         JOIN Moves m ON pm.move_id = m.id
         WHERE pm.pokemon_id = ? AND pm.level_learned = ?
         ORDER BY m.name
         """
         
-        cursor = conn.execute(query, [pokemon_id, level])
+        cursor = conn.execute(query, [pokemon_id, pokemon_id, level])
         moves = cursor.fetchall()
-        
-        # Get Pokemon name
-        pokemon_cursor = conn.execute("SELECT name FROM Pokemon WHERE id = ?", [pokemon_id])
-        pokemon_result = pokemon_cursor.fetchone()
-        pokemon_name = pokemon_result[0] if pokemon_result else f"Pokemon #{pokemon_id}"
+        pokemon_name = _pokemon_name(conn, pokemon_id, moves)
         
         result = {
             "pokemon_id": pokemon_id,
             "pokemon_name": pokemon_name,
             "level": level,
-            "moves": [dict(move) for move in moves]
+            "moves": [dict(zip(LEVEL_MOVE_COLS, move)) for move in moves]
         }
         
         return jsonify(result), 200
 
+@lru_cache(maxsize=256)
+def _base_stats_body(pokemon_id: int):
+    """Encoded base stats and their ETag, or None if the species doesn't exist"""
+    base_stats = get_db().get_pokemon_base_stats(pokemon_id)
+    return encode_json(base_stats) if base_stats else None
+
 @move_bp.route("/pokemon/<int:pokemon_id>/base_stats", methods=["GET"])
 def get_pokemon_base_stats_route(pokemon_id: int):
     """Get base stats for a Pokémon species"""
-    db = PokemonDatabase()
-    base_stats = db.get_pokemon_base_stats(pokemon_id)
-    if base_stats:
-        return jsonify(base_stats), 200
+    cached = _base_stats_body(pokemon_id)
+    if cached:
+        return etag_response(*cached)
     return jsonify({"error": "Pokémon not found"}), 404
 
+CALCULATE_STATS_FIELDS = frozenset(('base_stats', 'level', 'ivs', 'evs'))
+
 @move_bp.route("/calculate_stats", methods=["POST"])
 def calculate_stats_endpoint():
     """Calculate stats given base stats, level, IVs, and EVs"""
     data = request.get_json()
-    required_fields = ['base_stats', 'level', 'ivs', 'evs']
     
-    if not data or not all(field in data for field in required_fields):
+    if not data or not CALCULATE_STATS_FIELDS.issubset(data):
         return jsonify({"error": "Required fields: base_stats, level, ivs, evs"}), 400
     
     try:
         stats = Gen1StatCalculator.calculate_all_stats(
             data['base_stats'], data['level'], data['ivs'], data['evs']
         )
-        return jsonify(stats.dict()), 200
+        return jsonify(stats), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -262,7 +324,7 @@ def get_available_moves(pokemon_id: int):
     if not level:
         return jsonify({"error": "Level parameter is required"}), 400
     
-    db = PokemonDatabase()
+    db = get_db()
     try:
         moves = db.get_pokemon_available_moves(pokemon_id, level)
         return jsonify(moves), 200
@@ -272,7 +334,7 @@ def get_available_moves(pokemon_id: int):
 @move_bp.route("/moves/<int:move_id>", methods=["GET"])
 def get_move_details(move_id: int):
     """Get detailed information about a move"""
-    db = PokemonDatabase()
+    db = get_db()
     try:
         move = db.get_move_details(move_id)
         if move:
@@ -0,0 +1,32 @@
+"""
+Flask route handlers for the movedex (paginated move listing) endpoints.
+"""
+
+from functools import lru_cache
+from flask import Blueprint, request, jsonify
+from routes.http_cache import encode_json, etag_response
+from routes.db import get_db
+
+movedex_bp = Blueprint('movedex', __name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+@lru_cache(maxsize=256)
+def _movedex_body(search, move_type, limit: int, offset: int):
+    """Encoded movedex page and its ETag, built once per distinct query"""
+    moves = get_db().get_movedex(search=search, move_type=move_type, limit=limit, offset=offset)
+    return encode_json({"limit": limit, "offset": offset, "moves": moves})
+
+@movedex_bp.route("/movedex", methods=["GET"])
+def get_movedex():
+    """Get a page of moves, optionally filtered by name search and type"""
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    offset = request.args.get("offset", 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be positive and offset non-negative"}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
+    
+    return etag_response(*_movedex_body(
+        request.args.get("search"), request.args.get("type"), limit, offset
+    ))
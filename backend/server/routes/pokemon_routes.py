@@ -5,53 +5,116 @@ from flask_cors import cross_origin
 Flask route handlers for team pokemon management endpoints.
 """
 
-from flask import Blueprint, request, jsonify
-from database.database import TeamPokemon, PokemonDatabase
+from functools import lru_cache
+from typing import Annotated, List, Optional
+from flask import Blueprint, Response, request, jsonify
+from pydantic import Field, StrictInt, TypeAdapter, ValidationError
+from database.database import TeamPokemon
+from routes.http_cache import encode_json, etag_response
+from routes.db import get_db
 
 pokemon_bp = Blueprint('pokemon', __name__)
 
+EV_FIELDS = ('ev_hp', 'ev_attack', 'ev_defense', 'ev_speed', 'ev_special')
+MOVE_FIELDS = ('move1_id', 'move2_id', 'move3_id', 'move4_id')
+# Fields a PUT may change; team, species and IVs are fixed at creation
+UPDATABLE_FIELDS = ('nickname', 'level', 'status', 'current_hp') + EV_FIELDS + MOVE_FIELDS
+# PUT .../moves body: up to one move id (or null for an empty slot) per move field
+MOVE_IDS = TypeAdapter(Annotated[List[Optional[StrictInt]], Field(max_length=len(MOVE_FIELDS))])
+
+@lru_cache(maxsize=2048)
+def _team_pokemons_body(team_id: int, revision):
+    """Encoded team pokemon list and its ETag; revision changes on any write to the team's pokemon.
+
+    Only call this for existing teams: a missing team has no revision to
+    invalidate the entry with.
+    """
+    return encode_json(get_db().get_team_pokemons_by_team_id(team_id))
+
+@lru_cache(maxsize=2048)
+def _team_pokemon_stats_body(team_id: int, tp_id: int, revision):
+    """Encoded stats view of one team pokemon and its ETag, or None if it doesn't exist.
+
+    Like _team_pokemons_body, only call this for existing teams.
+    """
+    details = get_db().get_team_pokemon_with_stats(tp_id, team_id)
+    return encode_json(details) if details else None
+
+def _model_response(model, status=200):
+    """Serialize a pydantic model straight to a JSON response via pydantic-core"""
+    return Response(model.model_dump_json(), status=status, mimetype='application/json')
+
+def _validation_error(e: ValidationError):
+    """400 response for an invalid TeamPokemon or move_ids payload, naming the first bad EV if any"""
+    bad_ev = next((err['loc'][0] for err in e.errors() if err['loc'] and err['loc'][0] in EV_FIELDS), None)
+    if bad_ev:
+        return jsonify({"error": f"{bad_ev} must be between 0 and 65535"}), 400
+    return jsonify({"error": str(e)}), 400
+
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/", methods=["POST"])
 def create_team_pokemon(team_id):
-    db = PokemonDatabase()
+    db = get_db()
+    if not db.get_team(team_id):
+        return jsonify({"error": "Team not found"}), 404
     try:
         data = request.get_json()
         data['team_id'] = team_id
         
-        # Validate Effort Values (EVs)
-        ev_fields = ['ev_hp', 'ev_attack', 'ev_defense', 'ev_speed', 'ev_special']
-        for ev_field in ev_fields:
-            if ev_field in data:
-                ev_value = data[ev_field]
-                if not isinstance(ev_value, int) or ev_value < 0 or ev_value > 65535:
-                    return jsonify({"error": f"{ev_field} must be between 0 and 65535"}), 400
-        
-        tp = TeamPokemon(**data)
+        # EV bounds are enforced by the TeamPokemon model itself
+        tp = TeamPokemon.model_validate(data)
         created = db.create_team_pokemon(tp)
-        return jsonify(created.model_dump()), 201
+        return _model_response(created, 201)
+    except ValidationError as e:
+        return _validation_error(e)
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@pokemon_bp.route("/<int:team_id>/TeamPokemon/bulk", methods=["POST"])
+def create_team_pokemons(team_id):
+    """Add several Pokemon to a team in one request and one transaction"""
+    db = get_db()
+    if not db.get_team(team_id):
+        return jsonify({"error": "Team not found"}), 404
+    try:
+        data = request.get_json()
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Expected a non-empty list of Pokemon"}), 400
+        
+        tps = [TeamPokemon.model_validate({**item, 'team_id': team_id}) for item in data]
+        created = db.create_team_pokemons(team_id, tps)
+        return jsonify(created), 201
+    except ValidationError as e:
+        return _validation_error(e)
+    except (ValueError, TypeError) as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/<int:tp_id>", methods=["GET"])
 def get_team_pokemon(team_id, tp_id):
-    db = PokemonDatabase()
-    tp = db.get_team_pokemon(tp_id)
+    db = get_db()
+    tp = db.get_team_pokemon(tp_id, team_id)
     if tp:
-        return jsonify(tp.model_dump()), 200
+        return _model_response(tp)
     return jsonify({"error": "TeamPokemon not found"}), 404
 
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/", methods=["GET"])
 @pokemon_bp.route("/<int:team_id>/TeamPokemon", methods=["GET"])
 def get_team_pokemons(team_id):
-    db = PokemonDatabase()
-    tps = db.get_team_pokemons_by_team_id(team_id)
-    return jsonify(tps), 200
+    db = get_db()
+    revision = db.get_team_revision(team_id)
+    if revision is None:
+        # No Team row means no revision to key the cache on; read it live
+        return jsonify(db.get_team_pokemons_by_team_id(team_id)), 200
+    body, etag = _team_pokemons_body(team_id, revision)
+    return etag_response(body, etag, max_age=0)
 
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/count", methods=["GET"])
 def get_team_pokemon_count(team_id):
     """Get the current number of Pokemon in a team"""
-    db = PokemonDatabase()
+    db = get_db()
     try:
         count = db.get_team_pokemon_count(team_id)
         return jsonify({
@@ -65,54 +128,35 @@ def get_team_pokemon_count(team_id):
 
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/<int:tp_id>", methods=["PUT"])
 def update_team_pokemon(team_id, tp_id):
-    db = PokemonDatabase()
+    db = get_db()
     try:
         data = request.get_json()
         
         # Get existing pokemon
-        existing_tp = db.get_team_pokemon(tp_id)
+        existing_tp = db.get_team_pokemon(tp_id, team_id)
         if not existing_tp:
             return jsonify({"error": "TeamPokemon not found"}), 404
         
-        # Update fields
-        update_data = existing_tp.model_dump()
-        
-        # Basic fields
-        for field in ['nickname', 'level', 'status', 'current_hp']:
-            if field in data:
-                update_data[field] = data[field]
-        
-        # Validate and update EVs
-        ev_fields = ['ev_hp', 'ev_attack', 'ev_defense', 'ev_speed', 'ev_special']
-        for ev_field in ev_fields:
-            if ev_field in data:
-                ev_value = data[ev_field]
-                if not isinstance(ev_value, int) or ev_value < 0 or ev_value > 65535:
-                    return jsonify({"error": f"{ev_field} must be between 0 and 65535"}), 400
-                update_data[ev_field] = ev_value
-        
-        # Move slots
-        move_fields = ['move1_id', 'move2_id', 'move3_id', 'move4_id']
-        for move_field in move_fields:
-            if move_field in data:
-                update_data[move_field] = data[move_field]
-        
-        tp = TeamPokemon(**update_data)
+        # Overlay the changed fields and revalidate the whole model
+        updates = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+        tp = TeamPokemon.model_validate({**existing_tp.model_dump(), **updates})
         updated = db.update_team_pokemon(tp_id, tp)
         
         if updated:
-            return jsonify(updated.model_dump()), 200
+            return _model_response(updated)
         else:
             return jsonify({"error": "Failed to update TeamPokemon"}), 500
             
+    except ValidationError as e:
+        return _validation_error(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/<int:tp_id>", methods=["DELETE"])
 def delete_team_pokemon(team_id, tp_id):
-    db = PokemonDatabase()
+    db = get_db()
     try:
-        if db.delete_team_pokemon(tp_id):
+        if db.delete_team_pokemon(tp_id, team_id):
             return jsonify({"message": "TeamPokemon deleted successfully"}), 200
         return jsonify({"error": "TeamPokemon not found"}), 404
     except ValueError as ve:
@@ -123,42 +167,48 @@ def delete_team_pokemon(team_id, tp_id):
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/<int:tp_id>/stats", methods=["GET"])
 def get_team_pokemon_stats_route(team_id, tp_id):
     """Get calculated stats for a team's Pokémon"""
-    db = PokemonDatabase()
-    details = db.get_team_pokemon_with_stats(tp_id)
-    if details:
-        return jsonify(details), 200
+    db = get_db()
+    revision = db.get_team_revision(team_id)
+    if revision is None:
+        # Same as the list: nothing would invalidate a cached entry for a missing team
+        details = db.get_team_pokemon_with_stats(tp_id, team_id)
+        cached = encode_json(details) if details else None
+    else:
+        cached = _team_pokemon_stats_body(team_id, tp_id, revision)
+    if cached:
+        return etag_response(*cached, max_age=0)
     return jsonify({"error": "Team Pokémon not found"}), 404
 
 @pokemon_bp.route("/<int:team_id>/TeamPokemon/<int:tp_id>/moves", methods=["GET", "PUT", "OPTIONS"])
 @cross_origin()
 def team_pokemon_moves(team_id, tp_id):
-    db = PokemonDatabase()
-    tp = db.get_team_pokemon(tp_id)
-    if not tp:
-        return jsonify({"error": "TeamPokemon not found"}), 404
-
+    db = get_db()
     if request.method == "OPTIONS":
         # CORS preflight
         return ('', 204)
 
     if request.method == "GET":
+        tp = db.get_team_pokemon(tp_id, team_id)
+        if not tp:
+            return jsonify({"error": "TeamPokemon not found"}), 404
         # Return current moves for this TeamPokemon
         moves = []
-        for move_id in [tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id]:
+        for move_id in (tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id):
             if move_id:
                 move = db.get_move_by_id(move_id)
                 if move:
-                    moves.append(move.model_dump())
+                    moves.append(move)
         return jsonify({"current_moves": moves}), 200
 
     if request.method == "PUT":
-        data = request.get_json()
-        move_ids = data.get('move_ids', [])
-        # Pad or trim to 4
-        move_ids = (move_ids + [None]*4)[:4]
-        tp.move1_id, tp.move2_id, tp.move3_id, tp.move4_id = move_ids
-        updated = db.update_team_pokemon(tp_id, tp)
-        if updated:
+        data = request.get_json(silent=True)
+        try:
+            move_ids = MOVE_IDS.validate_python(data.get('move_ids', []) if isinstance(data, dict) else None)
+        except ValidationError as e:
+            return _validation_error(e)
+        # Pad to 4 in a single allocation
+        move_ids = [move_ids[i] if i < len(move_ids) else None for i in range(len(MOVE_FIELDS))]
+        # Write the slots directly; no need to load and revalidate the whole row
+        if db.set_team_pokemon_moves(tp_id, move_ids, team_id):
             return jsonify({"message": "Moves updated", "current_moves": move_ids}), 200
-        else:
-            return jsonify({"error": "Failed to update moves"}), 500
+        return jsonify({"error": "TeamPokemon not found"}), 404
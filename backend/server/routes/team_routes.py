@@ -3,49 +3,68 @@ Flask route handlers for team management endpoints.
 Separated from main Flask app for better organization.
 """
 
+import time
+from functools import lru_cache
 from flask import Blueprint, request, jsonify
-from database.database import Team, TeamPokemon, PokemonDatabase
+from database.database import Team, TeamPokemon
+from routes.http_cache import encode_json, etag_response
+from routes.db import get_db
 
 team_bp = Blueprint('teams', __name__)
 
+# Upper bound on how stale the team list can be in a worker that did not
+# handle the write (each process keeps its own cache)
+TEAMS_CACHE_TTL = 60
+
+@lru_cache(maxsize=1)
+def _teams_body(ttl_bucket: int):
+    """Encoded team list and its ETag; ttl_bucket changes every TEAMS_CACHE_TTL seconds"""
+    return encode_json([t.model_dump() for t in get_db().get_all_teams()])
+
+def _invalidate_teams():
+    """Drop the cached team list after a team is created, renamed or deleted"""
+    _teams_body.cache_clear()
+
 @team_bp.route("/", methods=["POST"])
 def create_team():
-    db = PokemonDatabase()
+    db = get_db()
     data = request.get_json()
     team = Team(**data)
     try:
         created = db.create_team(team)
-        return jsonify(created.model_dump()), 200
+        _invalidate_teams()
+        return jsonify(created), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 @team_bp.route("/<int:team_id>", methods=["GET"])
 def get_team(team_id):
-    db = PokemonDatabase()
+    db = get_db()
     team = db.get_team(team_id)
     if team:
-        return jsonify(team.model_dump()), 200
+        return jsonify(team), 200
     return jsonify({"error": "Team not found"}), 404
 
 @team_bp.route("/", methods=["GET"])
 def get_all_teams():
-    db = PokemonDatabase()
-    teams = db.get_all_teams()
-    return jsonify([t.model_dump() for t in teams]), 200
+    body, etag = _teams_body(int(time.monotonic() // TEAMS_CACHE_TTL))
+    return etag_response(body, etag, max_age=0)
 
 @team_bp.route("/<int:team_id>", methods=["PUT"])
 def update_team(team_id):
-    db = PokemonDatabase()
+    db = get_db()
     data = request.get_json()
     team = Team(**data)
     updated = db.update_team(team_id, team)
     if updated:
-        return jsonify(updated.model_dump()), 200
+        _invalidate_teams()
+        return jsonify(updated), 200
     return jsonify({"error": "Team not found"}), 404
 
 @team_bp.route("/<int:team_id>", methods=["DELETE"])
 def delete_team(team_id):
-    db = PokemonDatabase()
+    db = get_db()
     if db.delete_team(team_id):
+        _invalidate_teams()
         return jsonify({"message": "Team deleted successfully"}), 200
     return jsonify({"error": "Team not found"}), 404
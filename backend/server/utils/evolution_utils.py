@@ -2,86 +2,105 @@
 Evolution system utilities for automatic setup on Flask app startup.
 """
 
+import importlib
 import sqlite3
-import subprocess
+import sys
 import os
 
-def setup_evolution_system():
+LEGACY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "database", "legacy")
+
+# PokemonMoves should hold around 4172 rows once evolution moves are merged in
+MIN_POKEMON_MOVES = 4100
+
+def _sentinel_path(db_path):
+    """Marker file recording that db_path passed the evolution check"""
+    return db_path + ".evolution_ok"
+
+def _write_sentinel(db_path):
+    """Record that db_path has a complete evolution system"""
+    with open(_sentinel_path(db_path), "w"):
+        pass
+
+def _sentinel_is_fresh(db_path):
+    """True if the marker exists and is newer than the database and its WAL file.
+
+    In WAL mode writes land in the -wal file and only reach the main file at a
+    checkpoint, so the main file's mtime alone can miss them.
+    """
+    sentinel = _sentinel_path(db_path)
+    if not os.path.exists(sentinel):
+        return False
+    wal_path = db_path + "-wal"
+    last_write = max(os.path.getmtime(db_path), os.path.getmtime(wal_path) if os.path.exists(wal_path) else 0)
+    return os.path.getmtime(sentinel) > last_write
+
+def _evolution_status(db_path):
+    """Return (table_exists, evolution_count, total_moves) for the database"""
+    with sqlite3.connect(db_path) as conn:
+        table_exists, total_moves = conn.execute("""
+            SELECT EXISTS(SELECT 1 FROM sqlite_master WHERE type='table' AND name='Evolution'),
+                   (SELECT COUNT(*) FROM PokemonMoves)
+        """).fetchone()
+        evolution_count = conn.execute("SELECT COUNT(*) FROM Evolution").fetchone()[0] if table_exists else 0
+    return bool(table_exists), evolution_count, total_moves
+
+def _run_setup(db_path):
+    """Run the legacy setup script's main() in this interpreter instead of spawning one.
+
+    Marks the database as verified only if the setup succeeded, so a failed
+    run is retried on the next boot. Returns whether it succeeded.
+    """
+    if LEGACY_DIR not in sys.path:
+        sys.path.append(LEGACY_DIR)
+    setup_script = importlib.import_module("setup_evolution_system")
+    try:
+        if not setup_script.main(db_path):
+            print("❌ Setup failed")
+            return False
+    except Exception as e:
+        print(f"❌ Setup failed: {e}")
+        return False
+    print("✅ Evolution system setup completed!")
+    _write_sentinel(db_path)
+    return True
+
+def setup_evolution_system(db_path="pokemon.db"):
     """Automatically set up the evolution system if it doesn't exist"""
     try:
-        print("🔍 Checking evolution system status...")
-        
         # Check if database exists
-        if not os.path.exists("pokemon.db"):
+        if not os.path.exists(db_path):
             print("❌ Pokemon database not found")
             return False
-        
-        # Check if Evolution table exists and has data
-        conn = sqlite3.connect("pokemon.db")
-        cursor = conn.cursor()
-        
-        # Check if Evolution table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='Evolution'
-        """)
-        
-        table_exists = cursor.fetchone() is not None
-        
+
+        # A previous boot already verified this database and nothing has written to it since
+        if _sentinel_is_fresh(db_path):
+            return False
+
+        print("🔍 Checking evolution system status...")
+        table_exists, evolution_count, total_moves = _evolution_status(db_path)
+
         if not table_exists:
             print("❌ Evolution table not found")
             print("🚀 Setting up evolution system automatically...")
-            conn.close()
-            
-            # Run the external setup script
-            result = subprocess.run(["python", "setup_evolution_system.py"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ Evolution system setup completed!")
-            else:
-                print(f"❌ Setup failed: {result.stderr}")
+            _run_setup(db_path)
             return True
-        
-        # Check if table has data
-        cursor.execute("SELECT COUNT(*) FROM Evolution")
-        evolution_count = cursor.fetchone()[0]
-        
+
         if evolution_count == 0:
             print("❌ Evolution table is empty")
             print("🚀 Setting up evolution system automatically...")
-            conn.close()
-            
-            # Run the external setup script
-            result = subprocess.run(["python", "setup_evolution_system.py"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ Evolution system setup completed!")
-            else:
-                print(f"❌ Setup failed: {result.stderr}")
+            _run_setup(db_path)
             return True
-        
-        # Check if PokemonMoves has evolution moves (rough estimate)
-        cursor.execute("SELECT COUNT(*) FROM PokemonMoves")
-        total_moves = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        if total_moves < 4100:  # Should be around 4172 with evolution moves
+
+        if total_moves < MIN_POKEMON_MOVES:
             print(f"⚠️  PokemonMoves count ({total_moves}) suggests missing evolution moves")
             print("🚀 Updating Pokemon moves with evolution data...")
-            
-            # Run the external setup script
-            result = subprocess.run(["python", "setup_evolution_system.py"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ Evolution system setup completed!")
-            else:
-                print(f"❌ Setup failed: {result.stderr}")
+            _run_setup(db_path)
             return True
-        
+
         print(f"✅ Evolution system already set up ({evolution_count} evolutions, {total_moves} moves)")
+        _write_sentinel(db_path)
         return False
-        
+
     except Exception as e:
         print(f"❌ Error checking evolution system: {e}")
         return False
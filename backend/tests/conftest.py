@@ -0,0 +1,40 @@
+"""
+Shared pytest setup: import paths and a scratch copy of the shipped database.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    BACKEND_DIR,
+    os.path.join(BACKEND_DIR, "server"),
+    os.path.join(BACKEND_DIR, "server", "utils"),
+]
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory):
+    """Path to a copy of pokemon.db, so tests never touch the tracked file"""
+    path = tmp_path_factory.mktemp("db") / "pokemon.db"
+    shutil.copy(os.path.join(BACKEND_DIR, "database", "pokemon.db"), path)
+    return str(path)
+
+@pytest.fixture(scope="session")
+def client(db_path):
+    """Flask test client whose routes use the scratch database"""
+    from routes import db as routes_db
+    from app import create_app
+
+    os.environ[routes_db.DB_PATH_ENV] = db_path
+    routes_db.get_db.cache_clear()
+    yield create_app().test_client()
+    del os.environ[routes_db.DB_PATH_ENV]
+    routes_db.get_db.cache_clear()
+
+@pytest.fixture
+def team_id(client):
+    """A new, empty team"""
+    return client.post("/Teams/", json={"name": "Test Team"}).get_json()["id"]
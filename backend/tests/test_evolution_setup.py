@@ -0,0 +1,81 @@
+"""
+Tests for the evolution setup script's move propagation and chain parsing.
+"""
+
+import os
+import sqlite3
+import sys
+import types
+
+import pytest
+
+# The setup script imports requests for its PokeAPI calls, which these tests
+# never make; stand in an empty module where requests isn't installed
+try:
+    import requests  # noqa: F401
+except ImportError:
+    stub = types.ModuleType("requests")
+    stub.Session = object
+    sys.modules["requests"] = stub
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "legacy"))
+import setup_evolution_system as setup
+
+@pytest.fixture
+def conn():
+    """In-memory database with a three-stage chain (1 -> 2 -> 3) and an unrelated Pokemon 4"""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE Moves (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE PokemonMoves (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                   pokemon_id INT, move_id INT, level_learned INT);
+        INSERT INTO Moves (id, name) VALUES (1, 'tackle'), (2, 'growl'), (3, 'vine-whip'), (4, 'ember');
+        INSERT INTO PokemonMoves (pokemon_id, move_id, level_learned) VALUES
+            (1, 1, 1), (1, 2, 4), (1, 99, 7),
+            (2, 1, 1), (2, 3, 13),
+            (4, 4, 9);
+    """)
+    setup.create_evolution_table(conn)
+    setup.create_pokemon_moves_index(conn)
+    conn.executemany(setup.INSERT_EVOLUTION_SQL, [
+        (1, 2, "level", 16, None, False),
+        (2, 3, "level", 32, None, False),
+    ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+def moveset(conn, pokemon_id):
+    return set(conn.execute(
+        "SELECT move_id, level_learned FROM PokemonMoves WHERE pokemon_id = ?", (pokemon_id,)
+    ))
+
+def test_pre_evolution_moves_propagate_down_the_chain(conn):
+    setup.update_pokemon_moves_with_evolutions(conn)
+
+    assert moveset(conn, 1) == {(1, 1), (2, 4), (99, 7)}
+    assert moveset(conn, 2) == {(1, 1), (2, 4), (3, 13)}
+    assert moveset(conn, 3) == {(1, 1), (2, 4), (3, 13)}
+    assert moveset(conn, 4) == {(4, 9)}
+
+def test_propagation_is_idempotent(conn):
+    cursor = conn.cursor()
+    assert setup._add_pre_evolution_moves(cursor) == 4
+    assert setup._add_pre_evolution_moves(cursor) == 0
+
+def test_parse_evolution_chain_handles_branches():
+    def link(pokemon_id, details, evolves_to=()):
+        return {"species": {"url": f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"},
+                "evolution_details": details, "evolves_to": list(evolves_to)}
+
+    chain = {"chain": link(133, [], [
+        link(134, [{"item": {"name": "water-stone"}}]),
+        link(135, [{"item": {"name": "thunder-stone"}}]),
+        link(64, [{"min_level": 16}], [link(65, [{"trade_species": {"name": "shelmet"}}])]),
+    ])}
+    assert list(setup.parse_evolution_chain(chain)) == [
+        (133, 134, "item", None, "water-stone", False),
+        (133, 135, "item", None, "thunder-stone", False),
+        (133, 64, "level", 16, None, False),
+        (64, 65, "trade", None, None, True),
+    ]
@@ -0,0 +1,58 @@
+"""
+Tests for the startup evolution check and its sentinel file.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import types
+
+import pytest
+
+import evolution_utils
+
+@pytest.fixture
+def scratch_db(db_path, tmp_path):
+    path = str(tmp_path / "pokemon.db")
+    shutil.copy(db_path, path)
+    return path
+
+def fake_setup_script(monkeypatch, succeeds):
+    script = types.ModuleType("setup_evolution_system")
+    script.main = lambda db_path: succeeds
+    monkeypatch.setitem(sys.modules, "setup_evolution_system", script)
+
+def test_sentinel_written_only_when_setup_succeeds(monkeypatch, scratch_db):
+    fake_setup_script(monkeypatch, succeeds=False)
+    assert not evolution_utils._run_setup(scratch_db)
+    assert not os.path.exists(evolution_utils._sentinel_path(scratch_db))
+
+    fake_setup_script(monkeypatch, succeeds=True)
+    assert evolution_utils._run_setup(scratch_db)
+    assert os.path.exists(evolution_utils._sentinel_path(scratch_db))
+
+def test_sentinel_goes_stale_after_wal_write(scratch_db):
+    evolution_utils._write_sentinel(scratch_db)
+    os.utime(scratch_db, (1, 1))
+    os.utime(evolution_utils._sentinel_path(scratch_db), (2, 2))
+    assert evolution_utils._sentinel_is_fresh(scratch_db)
+
+    # Keep the connection open so the write stays in the -wal file
+    conn = sqlite3.connect(scratch_db)
+    try:
+        conn.execute("INSERT INTO Team (name) VALUES ('WAL Team')")
+        conn.commit()
+        assert os.path.getmtime(scratch_db) == 1
+        assert not evolution_utils._sentinel_is_fresh(scratch_db)
+    finally:
+        conn.close()
+
+def test_fresh_sentinel_skips_the_check(monkeypatch, scratch_db):
+    evolution_utils._write_sentinel(scratch_db)
+    os.utime(scratch_db, (1, 1))
+
+    def unexpected(db_path):
+        raise AssertionError("evolution status checked despite a fresh sentinel")
+    monkeypatch.setattr(evolution_utils, "_evolution_status", unexpected)
+    assert evolution_utils.setup_evolution_system(scratch_db) is False
@@ -0,0 +1,47 @@
+"""
+API tests for the Pokemon and move endpoints, run against a scratch copy of the database.
+"""
+
+from routes.db import get_db
+
+def test_moves_with_evolutions_streams_whole_body(client):
+    response = client.get("/Pokemon/6/moves/with_evolutions?max_level=30&type=level-up", buffered=True)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body) == {"pokemon_id", "pokemon_name", "evolution_chain", "filters", "moves", "total_moves"}
+    assert [evo["id"] for evo in body["evolution_chain"]] == [4, 5, 6]
+    assert body["filters"] == {"max_level": 30, "type": "level-up"}
+    assert body["total_moves"] == len(body["moves"]) > 0
+    assert all(move["level_learned"] <= 30 for move in body["moves"])
+
+    empty = client.get("/Pokemon/999/moves/with_evolutions", buffered=True).get_json()
+    assert (empty["moves"], empty["total_moves"]) == ([], 0)
+
+def test_moves_with_evolutions_releases_connection_on_close(client):
+    url = "/Pokemon/6/moves/with_evolutions"
+    pool = get_db()._pools[True]
+    client.get(url, buffered=True)
+    idle = pool.qsize()
+
+    # The streamed body holds a connection until the response is closed,
+    # even if it is never read
+    response = client.get(url)
+    assert pool.qsize() == idle - 1
+    response.close()
+    assert pool.qsize() == idle
+
+def test_reference_endpoints_revalidate_with_etag(client):
+    for url in ("/Pokemon/", "/Pokemon/?type=Fire", "/pokemon/6/base_stats"):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.cache_control.max_age > 0
+        etag = response.headers["ETag"]
+
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+        assert cached.headers["ETag"] == etag
+        assert client.get(url, headers={"If-None-Match": '"stale"'}).get_data() == response.get_data()
+
+    assert client.get("/Pokemon/").headers["ETag"] != client.get("/Pokemon/?type=Fire").headers["ETag"]
+    assert client.get("/pokemon/999/base_stats").status_code == 404
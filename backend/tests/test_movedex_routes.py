@@ -0,0 +1,42 @@
+"""
+API tests for the movedex endpoint, run against a scratch copy of the database.
+"""
+
+import sqlite3
+
+def test_movedex_paging(client):
+    page = client.get("/movedex?limit=10&offset=5").get_json()
+    assert (page["limit"], page["offset"]) == (10, 5)
+    assert [move["id"] for move in page["moves"]] == list(range(6, 16))
+
+    assert len(client.get("/movedex").get_json()["moves"]) == 50
+    assert client.get("/movedex?limit=10000").get_json()["limit"] == 500
+    assert client.get("/movedex?limit=0").status_code == 400
+    assert client.get("/movedex?offset=-1").status_code == 400
+
+def test_movedex_search_matches_like(client, db_path):
+    # Long enough for the trigram index, which must match LIKE's substring results
+    moves = client.get("/movedex?search=punch").get_json()["moves"]
+    with sqlite3.connect(db_path) as conn:
+        expected = [name for (name,) in conn.execute("SELECT name FROM Moves WHERE name LIKE '%punch%' ORDER BY id")]
+    assert expected and [move["name"] for move in moves] == expected
+
+    # Too short for trigrams, so answered with LIKE
+    short = client.get("/movedex?search=ch&limit=500").get_json()["moves"]
+    assert set(expected) <= {move["name"] for move in short}
+
+    fire = client.get("/movedex?search=punch&type=Fire").get_json()["moves"]
+    assert [move["name"] for move in fire] == ["fire-punch"]
+
+def test_new_database_without_trigrams_falls_back_to_like(tmp_path, monkeypatch):
+    from database import migrate_database
+    from database.services.database_service import PokemonDatabase
+
+    # Simulate an SQLite build without the trigram tokenizer
+    monkeypatch.setattr(migrate_database, "MOVES_FTS_SQL",
+                        migrate_database.MOVES_FTS_SQL.replace("tokenize='trigram'", "tokenize='no_such_tokenizer'"))
+    db = PokemonDatabase(str(tmp_path / "pokemon.db"))
+
+    assert not db.has_move_search_index
+    assert db.get_team_pokemon_count(1) > 0  # the rest of the database still loaded
+    assert "fire-punch" in [move["name"] for move in db.get_movedex(search="punch")]
@@ -0,0 +1,125 @@
+"""
+API tests for the team pokemon endpoints, run against a scratch copy of the database.
+"""
+
+def add_pokemon(client, team_id, **fields):
+    response = client.post(f"/Teams/{team_id}/TeamPokemon/", json={"pokemon_id": 25, "level": 10, **fields})
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def test_team_pokemon_list_follows_writes(client, team_id):
+    url = f"/Teams/{team_id}/TeamPokemon"
+    assert client.get(url).get_json() == []
+
+    first = add_pokemon(client, team_id, nickname="Sparky")
+    second = add_pokemon(client, team_id)
+    response = client.get(url)
+    assert [tp["id"] for tp in response.get_json()] == [first, second]
+
+    client.put(f"{url}/{first}", json={"nickname": "Bolt"})
+    updated = client.get(url)
+    assert updated.get_json()[0]["nickname"] == "Bolt"
+    assert updated.headers["ETag"] != response.headers["ETag"]
+
+    client.delete(f"{url}/{second}")
+    assert [tp["id"] for tp in client.get(url).get_json()] == [first]
+
+def test_team_pokemon_list_revalidates_with_etag(client, team_id):
+    url = f"/Teams/{team_id}/TeamPokemon"
+    add_pokemon(client, team_id)
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    add_pokemon(client, team_id)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+def test_missing_team_rejects_creates(client):
+    url = "/Teams/999999/TeamPokemon"
+    assert client.get(url).get_json() == []
+    assert client.post(f"{url}/", json={"pokemon_id": 25, "level": 10}).status_code == 404
+    assert client.post(f"{url}/bulk", json=[{"pokemon_id": 25, "level": 10}]).status_code == 404
+    assert client.get(url).get_json() == []
+
+def test_deleted_team_list_is_not_stale(client, team_id):
+    url = f"/Teams/{team_id}/TeamPokemon"
+    add_pokemon(client, team_id)
+    assert len(client.get(url).get_json()) == 1
+
+    client.delete(f"/Teams/{team_id}")
+    assert client.get(url).get_json() == []
+
+def test_stats_follow_writes(client, team_id):
+    tp_id = add_pokemon(client, team_id)
+    url = f"/Teams/{team_id}/TeamPokemon/{tp_id}"
+    response = client.get(f"{url}/stats")
+    before = response.get_json()["calculated_stats"]
+    assert client.get(f"{url}/stats", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    client.put(url, json={"level": 50})
+    after = client.get(f"{url}/stats").get_json()["calculated_stats"]
+    assert after["attack"] > before["attack"]
+
+def test_stats_of_deleted_team_are_not_stale(client, team_id):
+    tp_id = add_pokemon(client, team_id)
+    url = f"/Teams/{team_id}/TeamPokemon/{tp_id}/stats"
+    assert client.get(url).status_code == 200
+
+    client.delete(f"/Teams/{team_id}")
+    assert client.get(url).status_code == 404
+
+def test_bulk_create(client, team_id):
+    url = f"/Teams/{team_id}/TeamPokemon"
+    response = client.post(f"{url}/bulk", json=[
+        {"pokemon_id": 25, "level": 10},
+        {"pokemon_id": 4, "level": 12, "nickname": "Char"},
+    ])
+    assert response.status_code == 201
+    created = response.get_json()
+    assert [tp["pokemon_id"] for tp in created] == [25, 4]
+    assert all(tp["id"] and tp["current_hp"] > 0 for tp in created)
+    assert [tp["id"] for tp in client.get(url).get_json()] == [tp["id"] for tp in created]
+
+def test_bulk_create_is_all_or_nothing(client, team_id):
+    url = f"/Teams/{team_id}/TeamPokemon"
+    too_many = [{"pokemon_id": 25, "level": 10}] * 7
+    assert client.post(f"{url}/bulk", json=too_many).status_code == 400
+
+    bad_ev = [{"pokemon_id": 25, "level": 10}, {"pokemon_id": 4, "level": 10, "ev_hp": 70000}]
+    response = client.post(f"{url}/bulk", json=bad_ev)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "ev_hp must be between 0 and 65535"
+    assert client.post(f"{url}/bulk", json=[]).status_code == 400
+    assert client.get(url).get_json() == []
+
+def test_set_team_pokemon_moves(client, team_id):
+    tp_id = add_pokemon(client, team_id)
+    url = f"/Teams/{team_id}/TeamPokemon/{tp_id}"
+
+    response = client.put(f"{url}/moves", json={"move_ids": [85, 98]})
+    assert response.status_code == 200
+    assert response.get_json()["current_moves"] == [85, 98, None, None]
+    tp = client.get(url).get_json()
+    assert [tp[f"move{i}_id"] for i in range(1, 5)] == [85, 98, None, None]
+
+    for body in ({"move_ids": "85"}, {"move_ids": [85, "thunder"]}, {"move_ids": [1, 2, 3, 4, 5]}, [85]):
+        assert client.put(f"{url}/moves", json=body).status_code == 400
+    tp = client.get(url).get_json()
+    assert [tp[f"move{i}_id"] for i in range(1, 5)] == [85, 98, None, None]
+
+    other_team = client.post("/Teams/", json={"name": "Other Team"}).get_json()["id"]
+    assert client.put(f"/Teams/{other_team}/TeamPokemon/{tp_id}/moves", json={"move_ids": [1]}).status_code == 404
+
+def test_team_pokemon_is_scoped_to_its_team(client, team_id):
+    tp_id = add_pokemon(client, team_id, nickname="Sparky")
+    other_team = client.post("/Teams/", json={"name": "Other Team"}).get_json()["id"]
+    wrong = f"/Teams/{other_team}/TeamPokemon/{tp_id}"
+
+    assert client.get(wrong).status_code == 404
+    assert client.get(f"{wrong}/stats").status_code == 404
+    assert client.get(f"{wrong}/moves").status_code == 404
+    assert client.put(wrong, json={"nickname": "Stolen"}).status_code == 404
+    assert client.delete(wrong).status_code == 404
+    assert client.get(f"/Teams/{other_team}/TeamPokemon").get_json() == []
+
+    tp = client.get(f"/Teams/{team_id}/TeamPokemon/{tp_id}").get_json()
+    assert (tp["team_id"], tp["nickname"]) == (team_id, "Sparky")